@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db import models
 
-from .models import Category, Post, Location, Comment
+from .forms import BoundedImageField
+from .models import Category, Post, Location, Comment, ImageJob
 from .constants import LIST_PER_PAGE
 
 admin.site.empty_value_display = 'Не задано'
@@ -15,11 +17,15 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'category',
-                    'location', 'pub_date', 'is_published', 'created_at')
+    list_display = ('title', 'author', 'category', 'location', 'pub_date',
+                    'is_published', 'comment_count', 'created_at')
     list_filter = ('category', 'location', 'is_published', 'pub_date')
     search_fields = ('title', 'text')
     list_per_page = LIST_PER_PAGE
+    # Uploads past the limit arrive truncated, see BoundedUploadHandler.
+    formfield_overrides = {
+        models.ImageField: {'form_class': BoundedImageField},
+    }
 
 
 class LocationAdmin(admin.ModelAdmin):
@@ -36,7 +42,18 @@ class CommentAdmin(admin.ModelAdmin):
     list_per_page = LIST_PER_PAGE
 
 
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = ('image', 'post', 'status', 'created_at', 'queued_at',
+                    'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('image',)
+    readonly_fields = ('post', 'image', 'status', 'error', 'created_at',
+                       'queued_at', 'finished_at')
+    list_per_page = LIST_PER_PAGE
+
+
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Post, PostAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -0,0 +1,188 @@
+import hashlib
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+from .constants import (CACHE_EARLY_REFRESH_BETA, CACHE_LOCK_TIMEOUT,
+                        CACHE_LOCK_WAIT, CACHE_STALE_SECONDS)
+
+TAG_PREFIX = 'blog:tag:'
+
+# One flag per fill running in this thread, raised when the value being
+# computed read a stale entry.
+_fills = threading.local()
+
+
+def get_cache():
+    """The cache every blog cache lives in, see settings.BLOG_CACHE."""
+    return caches[getattr(settings, 'BLOG_CACHE', DEFAULT_CACHE_ALIAS)]
+
+
+def _tag_key(tag):
+    return f'{TAG_PREFIX}{tag}'
+
+
+def _read_versions(tags):
+    keys = {_tag_key(tag): tag for tag in tags}
+    cache = get_cache()
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    versions = {keys[key]: version for key, version in found.items()}
+    return versions, {keys[key] for key in missing}
+
+
+def tag_versions(*tags):
+    """Return the current version of every tag, creating missing ones.
+
+    A version is the time of the last invalidation in nanoseconds, so it
+    both identifies a state of the data and tells when it last changed.
+    """
+    return _read_versions(tags)[0]
+
+
+def invalidate_tags(*tags):
+    now = time.time_ns()
+    get_cache().set_many(
+        {_tag_key(tag): now for tag in tags}, timeout=None)
+
+
+def set_tagged(key, value, tags, timeout, since=None, delta=0):
+    """Store ``value`` together with the versions of the tags it reads.
+
+    ``since`` is when computing the value started: if one of its tags has
+    been invalidated after that, the value may already be stale and is
+    not stored. ``delta`` is how long computing took, in nanoseconds.
+    """
+    versions, created = _read_versions(tags)
+    if since is not None and any(
+        version > since
+        for tag, version in versions.items() if tag not in created
+    ):
+        return False
+    expires = None
+    if timeout is not None:
+        expires = time.time_ns() + timeout * 10 ** 9
+        timeout += _stale_seconds()
+    get_cache().set(key, (value, versions, expires, delta), timeout)
+    return True
+
+
+def _stale_seconds():
+    return getattr(settings, 'BLOG_CACHE_STALE_SECONDS', CACHE_STALE_SECONDS)
+
+
+def _entry_state(entry):
+    """'fresh', 'early' (fresh, but due for an early refresh), 'stale'
+    (outdated less than the stale window ago) or None.
+    """
+    if entry is None:
+        return None
+    _, versions, expires, delta = entry
+    now = time.time_ns()
+    changed = [
+        version for tag, version in tag_versions(*versions).items()
+        if version != versions[tag]
+    ]
+    if changed:
+        stale_since = max(changed)
+    elif expires is not None and now >= expires:
+        stale_since = expires
+    elif expires is not None and (
+            now - delta * CACHE_EARLY_REFRESH_BETA * math.log(
+                random.random() or 1e-12) >= expires):
+        return 'early'
+    else:
+        return 'fresh'
+    if now - stale_since <= _stale_seconds() * 10 ** 9:
+        return 'stale'
+    return None
+
+
+def _fill_stack():
+    if not hasattr(_fills, 'stack'):
+        _fills.stack = []
+    return _fills.stack
+
+
+def _served_stale():
+    # Whatever is being computed around a stale read is stale as well.
+    stack = _fill_stack()
+    stack[:] = [True] * len(stack)
+
+
+def _fill(key, compute, timeout):
+    stack = _fill_stack()
+    started = time.time_ns()
+    stack.append(False)
+    try:
+        value, tags = compute()
+    finally:
+        stale = stack.pop()
+    if stale:
+        # Built from outdated parts: storing it under the current tag
+        # versions would keep it after the parts are refreshed.
+        return value, 'stale'
+    if tags is not None:
+        set_tagged(key, value, tags, timeout, since=started,
+                   delta=time.time_ns() - started)
+    return value, 'miss'
+
+
+def fetch_tagged(key, compute, timeout=None):
+    """Read-through cache with single-flight fill.
+
+    ``compute()`` returns ``(value, tags)``, tags being None when the
+    value must not be stored. Returns ``(value, state)`` with state
+    'hit', 'stale' or 'miss'. A value computed from a stale entry of
+    another key is not stored and comes back 'stale' too.
+
+    One process at a time recomputes a key, holding a lock taken with
+    cache.add(); only backends with an atomic add() (Memcached, Redis)
+    make that strict, FileBasedCache may let two fills race. The
+    others serve the old value if it went stale less than
+    settings.BLOG_CACHE_STALE_SECONDS ago, or wait for the new one.
+    Entries with a timeout are refreshed early at random, more likely
+    the nearer the expiry and the slower the computation (XFetch).
+    """
+    cache = get_cache()
+    lock = f'{key}:lock'
+    deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+    while True:
+        entry = cache.get(key)
+        state = _entry_state(entry)
+        if state == 'fresh':
+            return entry[0], 'hit'
+        if cache.add(lock, 1, CACHE_LOCK_TIMEOUT):
+            try:
+                return _fill(key, compute, timeout)
+            finally:
+                cache.delete(lock)
+        if state == 'early':
+            return entry[0], 'hit'
+        if state is not None:
+            _served_stale()
+            return entry[0], 'stale'
+        if time.monotonic() >= deadline:
+            return _fill(key, compute, timeout)
+        time.sleep(CACHE_LOCK_WAIT)
+
+
+def cached_result(kind, name, compute, tags, timeout=None):
+    """Return ``compute()``, cached until one of its tags is invalidated.
+
+    ``tags`` lists the rows and tables the result was read from, or is a
+    callable building that list from the result.
+    """
+    def fill():
+        value = compute()
+        return value, tags(value) if callable(tags) else tags
+
+    digest = hashlib.md5(str(name).encode()).hexdigest()
+    return fetch_tagged(f'blog:query:{kind}:{digest}', fill, timeout)[0]
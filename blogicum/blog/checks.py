@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.checks import Error, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register()
+def check_release_cache(app_configs, **kwargs):
+    """Scheduled posts released by the release_posts process only reach
+    the web workers through a cache they share with it.
+    """
+    if getattr(settings, 'POST_RELEASE_LOOP', False):
+        return []
+    alias = getattr(settings, 'BLOG_CACHE', DEFAULT_CACHE_ALIAS)
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return [Warning(
+            'POST_RELEASE_LOOP is off, so scheduled posts only appear while '
+            '`manage.py release_posts --loop` runs or cron calls '
+            '`manage.py release_posts`.',
+            hint='Run release_posts, set POST_RELEASE_LOOP, or add '
+                 "'blog.W001' to SILENCED_SYSTEM_CHECKS once it is "
+                 'scheduled.',
+            id='blog.W001',
+        )]
+    return [Error(
+        f'The blog cache {alias!r} is local to each process, so posts '
+        f'released by `manage.py release_posts` never reach the web '
+        f'workers.',
+        hint='Point settings.BLOG_CACHE at a shared backend '
+             '(FileBasedCache, Memcached, Redis) or set POST_RELEASE_LOOP.',
+        id='blog.E001',
+    )]
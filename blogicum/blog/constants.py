@@ -1,3 +1,23 @@
 RECENT_NUM_POST = 5
 MAX_LENGTH = 256
 LIST_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+COUNT_CACHE_TIMEOUT = 60 * 60
+PAGE_LINKS_ON_EACH_SIDE = 2
+PAGE_LINKS_ON_ENDS = 1
+PAGE_CACHE_TIMEOUT = 60 * 60
+QUERY_CACHE_TIMEOUT = 60 * 60
+RELEASE_INTERVAL = 60
+EXCERPT_WORDS = 10
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 0.05
+CACHE_STALE_SECONDS = 30
+CACHE_EARLY_REFRESH_BETA = 1.0
+IMAGE_VARIANT_WIDTHS = (320, 640, 1280)
+IMAGE_VARIANT_QUALITY = 82
+IMAGE_SIZES = '(min-width: 40rem) 40rem, 100vw'
+IMAGE_JOB_WORKERS = 2
+IMAGE_JOB_STALE_AFTER = 10 * 60
+IMAGE_COLLECT_GRACE = 60 * 60
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
@@ -1,12 +1,50 @@
 from django import forms
+from django.conf import settings
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
+from .constants import IMAGE_UPLOAD_MAX_PIXELS
+from .images import IMAGE_ERRORS
 from .models import Post, Comment, User
+from .uploads import max_upload_bytes
+
+
+class BoundedImageField(forms.ImageField):
+    """ImageField that checks size and dimensions before anything is
+    decoded: the pixel count comes from the image header alone.
+    """
+
+    def to_python(self, data):
+        if data in self.empty_values:
+            return super().to_python(data)
+        limit = max_upload_bytes()
+        if getattr(data, 'oversized', False) or data.size > limit:
+            raise forms.ValidationError(
+                f'Файл больше {filesizeformat(limit)}.', code='too_large')
+        max_pixels = getattr(
+            settings, 'IMAGE_UPLOAD_MAX_PIXELS', IMAGE_UPLOAD_MAX_PIXELS)
+        try:
+            with Image.open(data) as image:
+                pixels = image.width * image.height
+        except Image.DecompressionBombError:
+            pixels = max_pixels + 1
+        except IMAGE_ERRORS:
+            # Not an image: left for ImageField to report.
+            pixels = 0
+        finally:
+            data.seek(0)
+        if pixels > max_pixels:
+            raise forms.ValidationError(
+                f'Картинка больше {max_pixels} пикселей.',
+                code='too_many_pixels')
+        return super().to_python(data)
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
         exclude = ('author',)
+        field_classes = {'image': BoundedImageField}
 
 
 class CommentForm(forms.ModelForm):
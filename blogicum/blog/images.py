@@ -0,0 +1,107 @@
+import json
+import posixpath
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from .constants import IMAGE_VARIANT_QUALITY, IMAGE_VARIANT_WIDTHS
+
+VARIANTS_DIR = 'variants'
+WEBP = 'webp'
+# Errors Pillow raises on files it cannot or will not decode.
+IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def _variants_path(name, suffix):
+    head, tail = posixpath.split(name)
+    stem = posixpath.splitext(tail)[0]
+    return posixpath.join(head, VARIANTS_DIR, f'{stem}{suffix}')
+
+
+def manifest_name(name):
+    return _variants_path(name, '.json')
+
+
+def pending_name(name):
+    return _variants_path(name, '.pending')
+
+
+def variant_name(name, width, ext):
+    return _variants_path(name, f'-{width}.{ext}')
+
+
+def fallback_format(name):
+    """PNG keeps transparency, everything else becomes JPEG."""
+    return 'png' if name.lower().endswith('.png') else 'jpg'
+
+
+def _save(storage, name, image, image_format):
+    buffer = BytesIO()
+    image.save(buffer, image_format, quality=IMAGE_VARIANT_QUALITY)
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def make_variants(storage, name):
+    """Write resized copies of the image at IMAGE_VARIANT_WIDTHS, each in
+    its fallback format and as WebP, next to a manifest listing them.
+
+    Widths above the original are replaced by the original width; EXIF
+    orientation is applied and the metadata dropped.
+    """
+    ext = fallback_format(name)
+    with storage.open(name) as file, Image.open(file) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if ext == 'png' else 'RGB')
+    widths = sorted(
+        {min(width, image.width) for width in IMAGE_VARIANT_WIDTHS})
+    for width in widths:
+        variant = image.copy()
+        variant.thumbnail((width, image.height))
+        _save(storage, variant_name(name, width, ext), variant,
+              'PNG' if ext == 'png' else 'JPEG')
+        _save(storage, variant_name(name, width, WEBP), variant, 'WEBP')
+    manifest = {'widths': widths, 'format': ext}
+    _save_manifest(storage, name, manifest)
+    return manifest
+
+
+def _save_manifest(storage, name, manifest):
+    target = manifest_name(name)
+    if storage.exists(target):
+        storage.delete(target)
+    storage.save(target, ContentFile(json.dumps(manifest).encode()))
+
+
+def read_manifest(storage, name):
+    target = manifest_name(name)
+    if not storage.exists(target):
+        return None
+    with storage.open(target) as file:
+        return json.load(file)
+
+
+def mark_pending(storage, name):
+    target = pending_name(name)
+    if not storage.exists(target):
+        storage.save(target, ContentFile(b''))
+
+
+def clear_pending(storage, name):
+    storage.delete(pending_name(name))
+
+
+def is_pending(storage, name):
+    return storage.exists(pending_name(name))
+
+
+def delete_variants(storage, name):
+    manifest = read_manifest(storage, name)
+    if manifest is None:
+        return
+    for width in manifest['widths']:
+        for ext in (manifest['format'], WEBP):
+            storage.delete(variant_name(name, width, ext))
+    storage.delete(manifest_name(name))
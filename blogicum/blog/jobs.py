@@ -0,0 +1,174 @@
+import logging
+import multiprocessing
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .caching import invalidate_tags
+from .constants import (IMAGE_COLLECT_GRACE, IMAGE_JOB_STALE_AFTER,
+                        IMAGE_JOB_WORKERS)
+from .images import (clear_pending, delete_variants, make_variants,
+                     mark_pending, read_manifest)
+from .models import ImageJob, Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def image_storage():
+    return Post._meta.get_field('image').storage
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=getattr(
+                settings, 'IMAGE_JOB_WORKERS', IMAGE_JOB_WORKERS),
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        )
+    return _executor
+
+
+def shutdown_executor():
+    """Wait for queued jobs, e.g. before a management command exits."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def process_image(name):
+    """Worker side: build the variants of one stored image.
+
+    Reads and writes files only, so it can run in a pool process.
+    """
+    make_variants(image_storage(), name)
+
+
+def enqueue_image(post):
+    """Record a job for the post's image and hand it to the worker pool.
+
+    With settings.IMAGE_JOB_MODE = 'inline' the job runs right away in
+    this process, as tests and management commands want.
+    """
+    job = ImageJob.objects.create(post=post, image=post.image.name)
+    if read_manifest(image_storage(), job.image) is not None:
+        # The same file was uploaded before and already has variants.
+        finish_job(job)
+        return job
+    _dispatch(job)
+    return job
+
+
+def requeue_stale_jobs(stale_after=IMAGE_JOB_STALE_AFTER):
+    """Hand jobs still pending ``stale_after`` seconds after they were
+    queued to the pool again.
+
+    The pool lives in a web process, so a restart or a crash there loses
+    its queue; only the ImageJob rows remember it.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    requeued = 0
+    stale = ImageJob.objects.filter(
+        status=ImageJob.PENDING, queued_at__lt=cutoff)
+    for job in stale.iterator():
+        # Whoever moves queued_at first owns the retry.
+        if not ImageJob.objects.filter(
+                pk=job.pk, status=ImageJob.PENDING, queued_at=job.queued_at,
+        ).update(queued_at=timezone.now()):
+            continue
+        _dispatch(job)
+        requeued += 1
+    return requeued
+
+
+def _dispatch(job):
+    mark_pending(image_storage(), job.image)
+    if getattr(settings, 'IMAGE_JOB_MODE', 'pool') == 'inline':
+        try:
+            process_image(job.image)
+        except Exception as error:
+            finish_job(job, error)
+        else:
+            finish_job(job)
+    else:
+        transaction.on_commit(lambda: _submit(job))
+
+
+def _submit(job):
+    def done(future):
+        try:
+            finish_job(job, future.exception())
+        finally:
+            connection.close()
+
+    get_executor().submit(process_image, job.image).add_done_callback(done)
+
+
+def finish_job(job, error=None):
+    """Parent side: store the outcome and let pages show the variants."""
+    if error is not None:
+        logger.warning('Image job %s failed: %s', job.pk, error)
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.FAILED if error else ImageJob.DONE,
+        error=str(error or ''),
+        finished_at=timezone.now(),
+    )
+    clear_pending(image_storage(), job.image)
+    # A new updated_at gives the post card a new cache key.
+    Post.objects.filter(pk=job.post_id).update(updated_at=timezone.now())
+    invalidate_tags(f'post:{job.post_id}')
+
+
+def collect_image(name, grace=IMAGE_COLLECT_GRACE, referenced=None):
+    """Delete a stored image and its variants once no post uses it.
+
+    Identical uploads share one file, so the posts referencing the name
+    are its reference count. A file written or reused less than
+    ``grace`` seconds ago is kept: a post saved under that name may not
+    be committed yet. collect_orphaned_images() gets it later.
+
+    ``referenced``, a set of the names posts hold, saves the query.
+    """
+    storage = image_storage()
+    if not name:
+        return False
+    if referenced is None:
+        referenced = Post.objects.filter(image=name).exists()
+    else:
+        referenced = name in referenced
+    if referenced:
+        return False
+    if storage.exists(name) and storage.get_modified_time(name) > (
+            timezone.now() - timedelta(seconds=grace)):
+        return False
+    storage.delete(name)
+    delete_variants(storage, name)
+    return True
+
+
+def collect_orphaned_images(grace=IMAGE_COLLECT_GRACE):
+    """Collect every stored upload no post refers to any more."""
+    storage = image_storage()
+    directory = Post._meta.get_field('image').upload_to.directory
+    if not storage.exists(directory):
+        return 0
+    # Read once: the image column has no index to look each file up by.
+    # A post saved meanwhile holds a file newer than ``grace``.
+    referenced = set(
+        Post.objects.exclude(image='').exclude(image=None).values_list(
+            'image', flat=True))
+    collected = 0
+    for shard in storage.listdir(directory)[0]:
+        for file in storage.listdir(posixpath.join(directory, shard))[1]:
+            collected += collect_image(
+                posixpath.join(directory, shard, file), grace, referenced)
+    return collected
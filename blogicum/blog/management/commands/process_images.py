@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from blog.constants import IMAGE_JOB_STALE_AFTER
+from blog.images import read_manifest
+from blog.jobs import (collect_orphaned_images, enqueue_image,
+                       requeue_stale_jobs, shutdown_executor)
+from blog.models import ImageJob, Post
+
+
+class Command(BaseCommand):
+    help = ('Ставит в очередь обработку картинок публикаций, '
+            'у которых ещё нет уменьшенных вариантов, повторяет '
+            'зависшие задачи и удаляет картинки без публикаций.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stale-after', type=float, default=IMAGE_JOB_STALE_AFTER,
+            help='Через сколько секунд ожидания задача считается '
+                 'потерянной.'
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Повторить обработку картинок, которые не удалось '
+                 'обработать раньше.'
+        )
+
+    def handle(self, *args, stale_after, retry_failed, **options):
+        requeued = requeue_stale_jobs(stale_after)
+        queued = 0
+        pending = ImageJob.objects.filter(
+            status=ImageJob.PENDING).values('post_id')
+        # A job that ran for the current file settles it, unless failed
+        # ones are asked to be retried.
+        settled = (ImageJob.DONE,) if retry_failed else (
+            ImageJob.DONE, ImageJob.FAILED)
+        processed = ImageJob.objects.filter(
+            post=OuterRef('pk'), image=OuterRef('image'),
+            status__in=settled,
+        )
+        posts = Post.objects.exclude(image='').exclude(image=None).exclude(
+            pk__in=pending).exclude(Exists(processed)).only('image')
+        for post in posts.iterator():
+            if read_manifest(post.image.storage, post.image.name):
+                continue
+            enqueue_image(post)
+            queued += 1
+        shutdown_executor()
+        collected = collect_orphaned_images()
+        self.stdout.write(self.style.SUCCESS(
+            f'Поставлено в очередь картинок: {queued}, '
+            f'повторено задач: {requeued}, удалено картинок: {collected}.'
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённое число комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько публикаций обновлять за один запрос.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        comments = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')).values('total')
+        ids = Post.objects.order_by('pk').values_list('pk', flat=True)
+        last_id, repaired = 0, 0
+        while True:
+            batch = list(ids.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+            stale = Post.objects.filter(pk__in=batch).annotate(
+                actual=Coalesce(Subquery(comments), 0)
+            ).exclude(comment_count=F('actual')).values_list('pk', flat=True)
+            repaired += Post.objects.filter(pk__in=list(stale)).update(
+                comment_count=Coalesce(Subquery(comments), 0)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено публикаций: {repaired}.')
+        )
@@ -0,0 +1,32 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from blog.constants import RELEASE_INTERVAL
+from blog.scheduler import release_due_posts, run_release_loop
+
+
+class Command(BaseCommand):
+    help = 'Открывает в лентах отложенные публикации, время которых пришло.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, дожидаясь следующих публикаций.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=RELEASE_INTERVAL,
+            help='Наибольшая пауза между проверками в секундах.'
+        )
+
+    def handle(self, *args, loop, interval, **options):
+        if not loop:
+            released = release_due_posts()
+            self.stdout.write(
+                self.style.SUCCESS(f'Открыто публикаций: {released}.')
+            )
+            return
+        try:
+            run_release_loop(threading.Event(), interval)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.caching import invalidate_tags
+from blog.models import Post
+from blog.rendering import render_excerpt, render_text_html
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает сохранённые анонсы и HTML текста публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько публикаций обрабатывать за один запрос.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.order_by('pk').only(
+            'text', 'excerpt', 'text_html', 'updated_at')
+        last_id, repaired = 0, 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            stale = []
+            for post in batch:
+                excerpt = render_excerpt(post.text)
+                text_html = render_text_html(post.text)
+                if (post.excerpt, post.text_html) != (excerpt, text_html):
+                    post.excerpt, post.text_html = excerpt, text_html
+                    # A new updated_at gives the post card a new cache key.
+                    post.updated_at = timezone.now()
+                    stale.append(post)
+            Post.objects.bulk_update(
+                stale, ['excerpt', 'text_html', 'updated_at'])
+            invalidate_tags(*(f'post:{post.pk}' for post in stale))
+            repaired += len(stale)
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено публикаций: {repaired}.')
+        )
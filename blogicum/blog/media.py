@@ -0,0 +1,130 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .query_budget import query_budget
+from .storage import is_content_addressed
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Bookkeeping next to the image variants, see blog.images.
+INTERNAL_SUFFIXES = ('.json', '.pending')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """File-like view of ``length`` bytes of ``file`` from ``start``."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """(start, end) of a single ``bytes=`` range, None for the whole file;
+    ValueError when the range cannot be satisfied.
+    """
+    match = RANGE.match(header or '')
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def _offload(mode, path, full_path):
+    # The front server sends the bytes; Django only checks the path. Both
+    # nginx and mod_xsendfile unescape it, non-ASCII names included.
+    response = HttpResponse()
+    response['Content-Type'] = (
+        mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+    if mode == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+            + quote(path))
+    else:
+        response['X-Sendfile'] = quote(full_path)
+    return response
+
+
+@query_budget(queries=0, time_ms=50)
+def serve_media(request, path, document_root=None):
+    """Serve a file from ``document_root``, MEDIA_ROOT by default.
+
+    settings.MEDIA_SERVE_MODE 'x-accel-redirect' (nginx) or 'x-sendfile'
+    (Apache, lighttpd) hands the transfer to the front server. Otherwise
+    the file is sent from here as a FileResponse, which the WSGI server
+    can pass to os.sendfile, with ETag/Last-Modified revalidation and
+    single byte-range requests.
+    """
+    try:
+        full_path = safe_join(document_root or settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path) or path.endswith(INTERNAL_SUFFIXES):
+        raise Http404
+    mode = getattr(settings, 'MEDIA_SERVE_MODE', None)
+    if mode:
+        response = _offload(mode, path, full_path)
+    else:
+        response = _send_file(request, full_path)
+    if is_content_addressed(path) and response.status_code in (200, 206):
+        response['Cache-Control'] = IMMUTABLE
+    return response
+
+
+def _send_file(request, full_path):
+    stat = os.stat(full_path)
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        return response
+    byte_range = None
+    if request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(
+                request.headers.get('Range'), stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1))
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        response['Content-Length'] = end - start + 1
+        response['Content-Type'] = (
+            mimetypes.guess_type(full_path)[0] or 'application/octet-stream')
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
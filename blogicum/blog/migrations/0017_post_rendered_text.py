@@ -0,0 +1,51 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:00
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+# Copies of blog.rendering as of this migration, so that later changes
+# to the app do not change what the migration wrote.
+def render_excerpt(text):
+    return Truncator(Truncator(text).words(10, truncate=' …')).chars(256)
+
+
+def render_text_html(text):
+    return linebreaksbr(text, autoescape=True)
+
+
+def render_post_text(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    batch = []
+    for post in Post.objects.only('text').iterator(chunk_size=BATCH_SIZE):
+        post.excerpt = render_excerpt(post.text)
+        post.text_html = render_text_html(post.text)
+        batch.append(post)
+        if len(batch) == BATCH_SIZE:
+            Post.objects.bulk_update(batch, ['excerpt', 'text_html'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt', 'text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=256, verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(render_post_text, migrations.RunPython.noop),
+    ]
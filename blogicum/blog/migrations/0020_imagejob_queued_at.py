@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 02:24
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0019_post_image_content_addressed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='queued_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Передано в обработку'),
+        ),
+    ]
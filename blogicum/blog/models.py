@@ -1,12 +1,23 @@
+import logging
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
 from .constants import MAX_LENGTH
+from .rendering import render_excerpt, render_text_html
+from .storage import ContentAddressedStorage, HashedUploadTo
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+
+class DeferredFieldLoaded(Exception):
+    pass
+
 
 class BaseModel(models.Model):
     is_published = models.BooleanField(
@@ -22,6 +33,18 @@ class BaseModel(models.Model):
     class Meta:
         abstract = True
 
+    def refresh_from_db(self, using=None, fields=None):
+        # Touching a deferred field costs one query per row; see
+        # settings.DEFERRED_FIELD_MODE.
+        mode = getattr(settings, 'DEFERRED_FIELD_MODE', None)
+        if mode and fields and set(fields) <= self.get_deferred_fields():
+            message = (f'{type(self).__name__} {self.pk} loaded deferred '
+                       f'fields {", ".join(fields)}')
+            if mode == 'raise':
+                raise DeferredFieldLoaded(message)
+            logger.warning(message)
+        super().refresh_from_db(using=using, fields=fields)
+
 
 class Category(BaseModel):
     title = models.CharField(
@@ -96,23 +119,105 @@ class Post(BaseModel):
         related_name='posts'
     )
     image = models.ImageField(
-        upload_to='posts/',
+        upload_to=HashedUploadTo('posts'),
+        storage=ContentAddressedStorage('posts'),
         blank=True,
         null=True,
         verbose_name=_('Картинка')
     )
+    excerpt = models.CharField(
+        max_length=MAX_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name=_('Анонс')
+    )
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name=_('Текст в HTML')
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_('Комментарии')
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_('Изменено')
+    )
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name=_('Видна в лентах'),
+        help_text=_('Публикация и её категория опубликованы, '
+                    'а дата публикации наступила.')
+    )
 
     class Meta:
         verbose_name = _('публикация')
         verbose_name_plural = _('Публикации')
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_visible=True),
+                name='post_visible_feed_idx',
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_visible=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.is_visible = self.compute_visibility()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {*update_fields, 'is_visible'}
+            if 'text' in update_fields:
+                update_fields |= {'excerpt', 'text_html'}
+            kwargs['update_fields'] = update_fields
+        if 'text' not in self.get_deferred_fields() and (
+                update_fields is None or 'text' in update_fields):
+            self.render_text()
+        super().save(*args, **kwargs)
+
+    def render_text(self):
+        self.excerpt = render_excerpt(self.text)
+        self.text_html = render_text_html(self.text)
+
+    def compute_visibility(self):
+        return (
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category_id is not None
+            and self.category.is_published
+        )
+
     def get_full_name(self):
         return f"{self.author.first_name} {self.author.last_name}".strip()
 
+    @property
+    def card_version(self):
+        """Everything post_card.html shows that can change."""
+        category, location = self.category, self.location
+        return (
+            self.updated_at,
+            self.comment_count,
+            self.author.username,
+            category and (category.slug, category.title,
+                          category.is_published),
+            location and (location.name, location.is_published),
+        )
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post,
@@ -124,8 +229,67 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at', 'id'],
+                name='comment_thread_idx',
+            ),
+        ]
 
     def __str__(self):
         return (
             f'Комментарий от {self.author.username} к посту {self.post.title}'
         )
+
+
+class ImageJob(models.Model):
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, _('В очереди')),
+        (DONE, _('Готово')),
+        (FAILED, _('Ошибка')),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name=_('Публикация')
+    )
+    image = models.CharField(
+        max_length=MAX_LENGTH,
+        verbose_name=_('Файл')
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name=_('Статус')
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name=_('Ошибка')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Добавлено')
+    )
+    queued_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Передано в обработку')
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Завершено')
+    )
+
+    class Meta:
+        verbose_name = _('обработка картинки')
+        verbose_name_plural = _('Обработка картинок')
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.image
@@ -0,0 +1,138 @@
+import hashlib
+from functools import wraps
+
+from django.template.loader import render_to_string
+
+from .caching import fetch_tagged, get_cache
+from .constants import PAGE_CACHE_TIMEOUT
+
+# Per-user fragments left as holes in cached pages, see the personal tag.
+PERSONAL_TEMPLATES = ('includes/header.html',)
+HOLE = '<!-- personal:{} -->'
+
+STATS_KEYS = {
+    'hits': 'blog:page_cache:hits',
+    'misses': 'blog:page_cache:misses',
+}
+
+
+def post_tags(post):
+    return [
+        f'post:{post.pk}',
+        f'user:{post.author_id}',
+        f'category:{post.category_id}',
+        f'location:{post.location_id}',
+    ]
+
+
+def add_cache_tags(request, *tags):
+    """Record what the page being rendered depends on."""
+    if hasattr(request, 'cache_tags'):
+        request.cache_tags.update(tags)
+
+
+def add_feed_tags(request, page_obj, *tags):
+    add_cache_tags(request, 'feed', *tags)
+    for post in page_obj:
+        add_cache_tags(request, *post_tags(post))
+
+
+def _page_key(request):
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'blog:page:{url}'
+
+
+def _count(event):
+    key = STATS_KEYS[event]
+    cache = get_cache()
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+def page_cache_stats():
+    values = get_cache().get_many(STATS_KEYS.values())
+    return {event: values.get(key, 0) for event, key in STATS_KEYS.items()}
+
+
+def _is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
+
+
+def personal_fragment(request, template_name):
+    """Render a per-user fragment, cached until the user changes."""
+    user = request.user
+    view_name = getattr(request.resolver_match, 'view_name', '')
+    tags = [f'user:{user.pk}'] if user.is_authenticated else []
+    key = f'blog:personal:{template_name}:{view_name}:{user.pk}'
+    return fetch_tagged(
+        key,
+        lambda: (render_to_string(template_name, request=request), tags),
+        PAGE_CACHE_TIMEOUT,
+    )[0]
+
+
+def fill_holes(request, response):
+    content = response.content.decode(response.charset)
+    for template_name in PERSONAL_TEMPLATES:
+        hole = HOLE.format(template_name)
+        if hole in content:
+            content = content.replace(
+                hole, personal_fragment(request, template_name))
+    response.content = content
+
+
+def _cached_page(view_func, shared):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated and not shared):
+            return view_func(request, *args, **kwargs)
+
+        def render():
+            request.cache_tags = set()
+            request.punch_holes = True
+            try:
+                response = view_func(request, *args, **kwargs)
+            finally:
+                request.punch_holes = False
+            if not _is_cacheable(request, response):
+                return response, None
+            return response, request.cache_tags
+
+        response, state = fetch_tagged(
+            _page_key(request), render, PAGE_CACHE_TIMEOUT)
+        _count('misses' if state == 'miss' else 'hits')
+        response['X-Page-Cache'] = state.upper()
+        fill_holes(request, response)
+        return response
+    return wrapper
+
+
+def cache_anonymous_page(view_func):
+    """Serve the whole response from the cache to anonymous readers.
+
+    Entries are keyed by the full URL, query string included, and are
+    stored along with the versions of the tags the view recorded with
+    add_cache_tags(); the model signals bump those tags, so a write drops
+    only the pages that showed the changed objects.
+
+    The stored page has holes in place of the PERSONAL_TEMPLATES, filled
+    in for the current reader on the way out. Entries are filled by one
+    request at a time, see caching.fetch_tagged().
+    """
+    return _cached_page(view_func, shared=False)
+
+
+def cache_shared_page(view_func):
+    """Like cache_anonymous_page, but logged-in readers get the same
+    entry: use it for pages whose only per-user part is a hole.
+    """
+    return _cached_page(view_func, shared=True)
@@ -0,0 +1,293 @@
+from itertools import chain
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import cached_result, fetch_tagged
+from .constants import (COMMENTS_PER_PAGE, COUNT_CACHE_TIMEOUT,
+                        LIST_PER_PAGE, PAGE_LINKS_ON_EACH_SIDE,
+                        PAGE_LINKS_ON_ENDS, QUERY_CACHE_TIMEOUT)
+from .page_cache import post_tags
+
+CURSOR_SALT = 'blog.paginators.cursor'
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+# Changes to these models can change how many posts a feed holds.
+COUNT_TAGS = ('post', 'category')
+
+
+def feed_tags(posts):
+    return ['feed', *chain.from_iterable(post_tags(post) for post in posts)]
+
+
+class FeedPage(Page):
+    @cached_property
+    def elided_page_range(self):
+        paginator = self.paginator
+        pages = list(paginator.get_elided_page_range(
+            min(self.number, paginator.num_pages),
+            on_each_side=paginator.on_each_side,
+            on_ends=paginator.on_ends,
+        ))
+        if self.number > paginator.num_pages:
+            # Past the estimated count: link back to where it stops.
+            if self.number > paginator.num_pages + 1:
+                pages.append(paginator.ELLIPSIS)
+            pages.append(self.number)
+        return pages
+
+    def has_next(self):
+        if self.paginator.count_is_estimate:
+            # The feed may go on past the estimate while pages come full.
+            return (self.number < self.paginator.num_pages
+                    or len(self) == self.paginator.per_page)
+        return super().has_next()
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that keeps the feed size in the cache.
+
+    ``count_key`` names the feed; the cached value is dropped whenever a
+    post or category is written, scheduled releases included. The posts
+    of each page are cached too, until one of them or the feed changes.
+    With ``estimate_limit`` the count stops at that many rows and the
+    page links are capped accordingly; the pages past it stay reachable
+    through the next page links.
+
+    Pages expose ``elided_page_range``: the first and last ``on_ends``
+    pages plus ``on_each_side`` pages around the current one.
+    """
+
+    def __init__(self, object_list, per_page, count_key,
+                 timeout=COUNT_CACHE_TIMEOUT, estimate_limit=None,
+                 on_each_side=PAGE_LINKS_ON_EACH_SIDE,
+                 on_ends=PAGE_LINKS_ON_ENDS, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.timeout = timeout
+        self.estimate_limit = estimate_limit
+        self.on_each_side = on_each_side
+        self.on_ends = on_ends
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        count, _ = fetch_tagged(
+            f'blog:count:{self.count_key}',
+            lambda: (self._count(), COUNT_TAGS),
+            self.timeout,
+        )
+        if self.estimate_limit is not None:
+            self.count_is_estimate = count >= self.estimate_limit
+        return count
+
+    def _count(self):
+        if self.estimate_limit is None:
+            return super().count
+        return self.object_list[:self.estimate_limit].count()
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_estimate or int(number) < 1:
+                raise
+            # Only fetching a page past the estimate tells if it exists.
+            return int(number)
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            return self.page(self.num_pages)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count and not self.count_is_estimate:
+            top = self.count
+        rows = cached_result(
+            'feed', (self.count_key, bottom, top),
+            lambda: list(self.object_list[bottom:top]),
+            feed_tags, QUERY_CACHE_TIMEOUT,
+        )
+        if not rows and number > self.num_pages:
+            raise EmptyPage('That page contains no results')
+        return self._get_page(rows, number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class CursorPage:
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset pagination over a unique ordering such as (pub_date, id).
+
+    Pages are addressed by signed opaque tokens holding the key of the
+    boundary row, so fetching any page is an index range read of
+    per_page + 1 rows with no COUNT and no OFFSET.
+    """
+
+    is_cursor = True
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        descending = {field.startswith('-') for field in ordering}
+        if len(descending) != 1:
+            raise ValueError('Все поля курсора должны сортироваться '
+                             'в одном направлении.')
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.descending = descending.pop()
+        self.fields = [field.lstrip('-') for field in ordering]
+
+    def get_page(self, cursor=None):
+        direction, key = self.decode(cursor)
+        forward = direction == FORWARD
+        rows = list(self.page_queryset(direction, key))
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows, self)
+        has_next = has_more if forward else True
+        has_previous = key is not None if forward else has_more
+        return CursorPage(
+            rows,
+            self,
+            next_cursor=(self.encode(rows[-1], FORWARD)
+                         if has_next else None),
+            previous_cursor=(self.encode(rows[0], BACKWARD)
+                             if has_previous else None),
+        )
+
+    def page_queryset(self, direction, key=None):
+        forward = direction == FORWARD
+        queryset = self.queryset
+        if key is not None:
+            queryset = queryset.filter(self._after(key, forward))
+        ordering = self.ordering if forward else self._reversed_ordering()
+        return queryset.order_by(*ordering)[:self.per_page + 1]
+
+    def encode(self, obj, direction):
+        values = [
+            self._field(name).value_to_string(obj) for name in self.fields
+        ]
+        return signing.dumps([direction, values], salt=CURSOR_SALT)
+
+    def decode(self, cursor):
+        if not cursor:
+            return FORWARD, None
+        try:
+            direction, values = signing.loads(cursor, salt=CURSOR_SALT)
+            key = [
+                self._field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (signing.BadSignature, ValidationError, TypeError,
+                ValueError):
+            return FORWARD, None
+        if direction not in (FORWARD, BACKWARD) or len(key) != len(
+                self.fields):
+            return FORWARD, None
+        return direction, key
+
+    def _field(self, name):
+        return self.queryset.model._meta.get_field(name)
+
+    def _reversed_ordering(self):
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering
+        )
+
+    def _after(self, key, forward):
+        # Rows strictly past ``key`` in the walking direction, written as
+        # a range on the leading field plus the full tie-break so that the
+        # database can still read it off the composite index.
+        strict = 'lt' if self.descending == forward else 'gt'
+        lookup = Q()
+        for i, name in enumerate(self.fields):
+            equal = {field: value
+                     for field, value in zip(self.fields[:i], key[:i])}
+            lookup |= Q(**equal, **{f'{name}__{strict}': key[i]})
+        return Q(**{f'{self.fields[0]}__{strict}e': key[0]}) & lookup
+
+
+def cached_cursor_page(paginator, name, cursor, tags):
+    """CursorPaginator.get_page() with the rows cached under ``tags``,
+    a callable taking the rows.
+    """
+    def fetch():
+        page = paginator.get_page(cursor)
+        return page.object_list, page.next_cursor, page.previous_cursor
+
+    rows, next_cursor, previous_cursor = cached_result(
+        'cursor', (name, paginator.per_page, cursor or ''), fetch,
+        lambda result: tags(result[0]), QUERY_CACHE_TIMEOUT,
+    )
+    return CursorPage(rows, paginator, next_cursor, previous_cursor)
+
+
+def paginate(request, queryset, count_key, per_page=None, mode=None):
+    per_page = per_page or LIST_PER_PAGE
+    mode = mode or getattr(settings, 'FEED_PAGINATION', 'offset')
+    cursor = request.GET.get('cursor')
+    if mode == 'cursor' or cursor is not None:
+        return cached_cursor_page(
+            CursorPaginator(queryset, per_page), count_key, cursor,
+            feed_tags)
+    paginator = CachedCountPaginator(
+        queryset, per_page, count_key,
+        estimate_limit=getattr(settings, 'FEED_COUNT_ESTIMATE_LIMIT', None),
+    )
+    return paginator.get_page(request.GET.get('page'))
+
+
+def paginate_comments(post, cursor=None):
+    comments = post.comments.select_related('author')
+    paginator = CursorPaginator(
+        comments, COMMENTS_PER_PAGE, ordering=('created_at', 'id'))
+    return cached_cursor_page(
+        paginator, f'comments:{post.pk}', cursor,
+        lambda rows: [f'post:{post.pk}', *(
+            f'user:{comment.author_id}' for comment in rows
+        )],
+    )
@@ -0,0 +1,95 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.duration += time.monotonic() - start
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+
+@contextmanager
+def count_queries():
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        yield counter
+
+
+class QueryBudget:
+    def __init__(self, queries, time_ms):
+        self.queries = queries
+        self.time_ms = time_ms
+
+    def violations(self, counter):
+        errors = []
+        if counter.queries > self.queries:
+            errors.append(
+                f'{counter.queries} SQL queries (budget {self.queries})')
+        if counter.duration_ms > self.time_ms:
+            errors.append(
+                f'{counter.duration_ms:.1f} ms in SQL '
+                f'(budget {self.time_ms} ms)')
+        return errors
+
+
+def query_budget(queries, time_ms):
+    """Declare the SQL budget of a view for QueryBudgetMiddleware."""
+    def decorator(view_func):
+        view_func.query_budget = QueryBudget(queries, time_ms)
+        return view_func
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """Count the SQL run by each request and check it against the budget
+    declared on the view.
+
+    ``settings.QUERY_BUDGET_MODE`` selects what happens on overspend:
+    ``'log'`` writes a warning, ``'raise'`` raises QueryBudgetExceeded,
+    anything falsy disables the check.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', None)
+        if not mode:
+            return self.get_response(request)
+        with count_queries() as counter:
+            response = self.get_response(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is not None:
+            errors = budget.violations(counter)
+            if errors:
+                message = (f'{request.method} {request.path} is over its '
+                           f'query budget: {"; ".join(errors)}')
+                if mode == 'raise':
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
@@ -1,17 +1,77 @@
-from django.db.models import Count
-from django.utils import timezone
+from django.db.models import Q
+from django.http import Http404
 
+from .caching import cached_result
+from .constants import QUERY_CACHE_TIMEOUT
 from .models import Post
 
+FEED_RELATED_FIELDS = ('author', 'category', 'location')
 
-def comment_count(queryset):
-    return queryset.annotate(
-        comment_count=Count('comments')).order_by('-pub_date')
+CARD_TEMPLATE = 'includes/post_card.html'
+DETAIL_TEMPLATE = 'blog/detail.html'
+
+# Post columns each template reads; everything else, the raw text above
+# all, stays in the database. Related rows are loaded whole.
+TEMPLATE_FIELDS = {
+    CARD_TEMPLATE: (
+        'title', 'excerpt', 'pub_date', 'is_published', 'image',
+        'comment_count', 'updated_at', *FEED_RELATED_FIELDS,
+    ),
+    DETAIL_TEMPLATE: (
+        'title', 'text_html', 'pub_date', 'is_published', 'image',
+        *FEED_RELATED_FIELDS,
+    ),
+}
+
+# What the profile page shows of its user; credentials stay out of the
+# cache.
+PROFILE_FIELDS = (
+    'username', 'first_name', 'last_name', 'date_joined', 'is_staff',
+)
+
+
+def select_feed_related(queryset, template_name=CARD_TEMPLATE):
+    return queryset.select_related(
+        *FEED_RELATED_FIELDS
+    ).only(*TEMPLATE_FIELDS[template_name])
+
+
+def published_filter():
+    # is_visible folds together the post's and its category's publication
+    # state and the release time, so feeds filter on one indexed column.
+    return Q(is_visible=True)
 
 
 def get_published_posts():
-    return Post.objects.filter(
-        is_published=True,
-        category__is_published=True,
-        pub_date__lte=timezone.now()
+    return select_feed_related(
+        Post.objects.filter(published_filter())
     ).order_by('-pub_date')
+
+
+def get_visible_posts(user, template_name=DETAIL_TEMPLATE):
+    visible = published_filter()
+    if user.is_authenticated:
+        visible |= Q(author=user)
+    return select_feed_related(Post.objects.filter(visible), template_name)
+
+
+def get_cached_object_or_404(model, fields=None, **lookup):
+    """get_object_or_404() through the query cache.
+
+    ``fields`` limits the columns loaded and cached. A found row is
+    dropped from the cache when that row is written, a miss when
+    anything in its table is.
+    """
+    name = model._meta.model_name
+    queryset = model.objects.filter(**lookup)
+    if fields is not None:
+        queryset = queryset.only(*fields)
+    obj = cached_result(
+        name, (sorted(lookup.items()), fields),
+        queryset.first,
+        lambda obj: [name] if obj is None else [f'{name}:{obj.pk}'],
+        QUERY_CACHE_TIMEOUT,
+    )
+    if obj is None:
+        raise Http404(f'No {model._meta.object_name} matches the query.')
+    return obj
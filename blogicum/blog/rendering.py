@@ -0,0 +1,14 @@
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+from .constants import EXCERPT_WORDS, MAX_LENGTH
+
+
+def render_excerpt(text):
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(MAX_LENGTH)
+
+
+def render_text_html(text):
+    return linebreaksbr(text, autoescape=True)
@@ -0,0 +1,68 @@
+import logging
+import threading
+
+from django.db import close_old_connections
+from django.db.models import Min
+from django.utils import timezone
+
+from .constants import RELEASE_INTERVAL
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def pending_posts():
+    return Post.objects.filter(
+        is_published=True,
+        is_visible=False,
+        category__is_published=True,
+    )
+
+
+def release_due_posts():
+    """Make visible every published post whose pub_date has come.
+
+    Each post goes through save(), so the release fires the same signals,
+    and with them the same cache invalidation, as an edit would.
+    """
+    released = 0
+    due = pending_posts().filter(pub_date__lte=timezone.now())
+    for post in due.iterator():
+        post.save(update_fields=['is_visible'])
+        released += 1
+    if released:
+        logger.info('Released %d scheduled posts.', released)
+    return released
+
+
+def seconds_to_next_release(interval=RELEASE_INTERVAL):
+    next_date = pending_posts().aggregate(next=Min('pub_date'))['next']
+    if next_date is None:
+        return interval
+    wait = (next_date - timezone.now()).total_seconds()
+    return min(interval, max(wait, 0))
+
+
+def run_release_loop(stop_event, interval=RELEASE_INTERVAL):
+    while not stop_event.is_set():
+        try:
+            release_due_posts()
+            wait = seconds_to_next_release(interval)
+        except Exception:
+            logger.exception('Scheduled release failed.')
+            wait = interval
+        finally:
+            close_old_connections()
+        stop_event.wait(wait)
+
+
+def start_release_loop(interval=RELEASE_INTERVAL):
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=run_release_loop,
+        args=(stop_event, interval),
+        name='blog-release-loop',
+        daemon=True,
+    )
+    thread.start()
+    return stop_event
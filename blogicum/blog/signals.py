@@ -0,0 +1,158 @@
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import invalidate_tags
+from .jobs import collect_image, enqueue_image
+from .models import Category, Comment, Location, Post, User
+
+CACHED_MODELS = (Post, Category, Location, Comment)
+
+
+def invalidate(*tags):
+    # Once now and again after commit: a request in between may have
+    # cached rows this transaction had not changed yet, such as the
+    # posts a category toggle hides with a bulk UPDATE.
+    invalidate_tags(*tags)
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
+    )
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._saved_post_id = None
+        return
+    instance._saved_post_id = Comment.objects.filter(
+        pk=instance.pk
+    ).values_list('post_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous_post_id = getattr(instance, '_saved_post_id', None)
+    if created:
+        change_comment_count(instance.post_id, 1)
+    elif previous_post_id != instance.post_id:
+        if previous_post_id is not None:
+            change_comment_count(previous_post_id, -1)
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+
+
+def invalidate_instance(sender, instance, **kwargs):
+    name = sender._meta.model_name
+    invalidate(name, f'{name}:{instance.pk}')
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_instance, sender=model,
+                      dispatch_uid=f'invalidate_{model._meta.model_name}')
+    post_delete.connect(invalidate_instance, sender=model,
+                        dispatch_uid=f'invalidate_{model._meta.model_name}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feeds(sender, **kwargs):
+    invalidate('feed')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    invalidate(f'post:{instance.post_id}')
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, **kwargs):
+    instance._saved_is_published = None
+    if not instance._state.adding:
+        instance._saved_is_published = Category.objects.filter(
+            pk=instance.pk
+        ).values_list('is_published', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def sync_category_posts_visibility(sender, instance, created, **kwargs):
+    # A bulk UPDATE rather than a save per post: toggling a category in
+    # the admin list costs one statement however many posts it holds.
+    if created or instance._saved_is_published == instance.is_published:
+        return
+    posts = Post.objects.filter(category=instance)
+    if instance.is_published:
+        posts.filter(
+            is_published=True, pub_date__lte=timezone.now()
+        ).update(is_visible=True)
+    else:
+        posts.update(is_visible=False)
+
+
+@receiver(pre_delete, sender=Category)
+def hide_category_posts(sender, instance, **kwargs):
+    # The posts keep existing with category set to NULL and leave feeds.
+    Post.objects.filter(category=instance).update(is_visible=False)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, **kwargs):
+    # Publishing or hiding a category adds or removes its posts from feeds.
+    if getattr(instance, '_saved_is_published', None) != (
+            instance.is_published):
+        invalidate('feed')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    invalidate('user', f'user:{instance.pk}')
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_image(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    instance._image_changed = False
+    instance._saved_image = ''
+    if raw or update_fields is not None and 'image' not in update_fields:
+        return
+    if not instance._state.adding:
+        instance._saved_image = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('image', flat=True).first() or ''
+    instance._image_changed = (
+        (instance.image.name or '') != instance._saved_image)
+
+
+@receiver(post_save, sender=Post)
+def process_post_image(sender, instance, **kwargs):
+    if not instance._image_changed:
+        return
+    if instance.image:
+        enqueue_image(instance)
+    if instance._saved_image != (instance.image.name or ''):
+        # Only once the new name is committed is the old file unused.
+        saved = instance._saved_image
+        transaction.on_commit(lambda: collect_image(saved))
+
+
+@receiver(post_delete, sender=Post)
+def collect_post_image(sender, instance, **kwargs):
+    name = instance.image.name
+    transaction.on_commit(lambda: collect_image(name))
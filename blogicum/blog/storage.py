@@ -0,0 +1,76 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# Uploads, ``ab/<sha256>.jpg``, and their resized copies,
+# ``ab/variants/<sha256>-640.webp``.
+HASHED_NAME = re.compile(
+    r'(^|/)[0-9a-f]{2}/(variants/[0-9a-f]{64}-\d+|[0-9a-f]{64})\.\w+$')
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def is_content_addressed(name):
+    """Hash-named files never change, so they can be cached forever."""
+    return bool(HASHED_NAME.search(name))
+
+
+def hashed_name(directory, name, content):
+    """``<directory>/ab/abcdef….jpg``, named by the SHA-256 of ``content``."""
+    digest = content_hash(content)
+    ext = posixpath.splitext(name)[1].lower()
+    return posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+
+@deconstructible
+class HashedUploadTo:
+    """upload_to placing files in ``directory``.
+
+    The final name depends on the bytes, which upload_to does not get;
+    ContentAddressedStorage picks it when the file is saved.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def __call__(self, instance, filename):
+        return posixpath.join(self.directory, posixpath.basename(filename))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names the files saved directly in
+    ``directory`` by their content and stores identical ones once.
+
+    Saving under a name that already exists writes nothing and returns
+    that name: hash names guarantee the bytes are the same, and every
+    other writer in the blog deletes a file before replacing it. The
+    reused file is touched, which keeps jobs.collect_image() off it while
+    the post taking it over is being committed.
+    """
+
+    def __init__(self, directory='posts', **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+
+    def save(self, name, content, max_length=None):
+        if name is not None and posixpath.dirname(name) == self.directory:
+            if not hasattr(content, 'chunks'):
+                content = File(content, name)
+            name = hashed_name(self.directory, name, content)
+        if name is not None and self.exists(name):
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length=max_length)
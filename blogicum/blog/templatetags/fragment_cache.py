@@ -0,0 +1,46 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from blog.caching import fetch_tagged
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        if timeout is not None:
+            timeout = int(timeout)
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [var.resolve(context) for var in self.vary_on],
+        )
+        return fetch_tagged(
+            key, lambda: (self.nodelist.render(context), ()), timeout)[0]
+
+
+@register.tag
+def fragment_cache(parser, token):
+    """Like {% cache %}, but filled through caching.fetch_tagged() in the
+    blog cache:
+
+        {% fragment_cache 600 name var1 var2 %} ... {% endfragment_cache %}
+    """
+    nodelist = parser.parse(('endfragment_cache',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least 2 arguments.")
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2],
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
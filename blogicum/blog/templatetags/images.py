@@ -0,0 +1,58 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from blog.caching import cached_result
+from blog.constants import IMAGE_SIZES, QUERY_CACHE_TIMEOUT
+from blog.images import WEBP, is_pending, read_manifest, variant_name
+
+register = template.Library()
+
+
+def _srcset(image, manifest, ext):
+    return ', '.join(
+        f'{image.storage.url(variant_name(image.name, width, ext))} {width}w'
+        for width in manifest['widths']
+    )
+
+
+def image_state(image):
+    """(manifest, pending) of a post image, cached until the post
+    changes; finishing an image job invalidates the post.
+    """
+    def compute():
+        manifest = read_manifest(image.storage, image.name)
+        pending = manifest is None and is_pending(image.storage, image.name)
+        return manifest, pending
+
+    post_id = image.instance.pk
+    return cached_result(
+        'image', (post_id, image.name), compute, [f'post:{post_id}'],
+        QUERY_CACHE_TIMEOUT,
+    )
+
+
+@register.simple_tag
+def responsive_image(image, sizes=IMAGE_SIZES, **attrs):
+    """<img> with srcset over the resized variants of ``image``, wrapped
+    in <picture> with a WebP source.
+
+    While the variants are being built a placeholder takes the image's
+    place; an image without variants is shown as is.
+    """
+    manifest, pending = image_state(image)
+    if pending:
+        return format_html(
+            '<div class="text-center text-muted border rounded py-5 mb-2">'
+            'Картинка обрабатывается…</div>')
+    if manifest is None:
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}"{}>'
+        '</picture>',
+        _srcset(image, manifest, WEBP), sizes,
+        image.url, _srcset(image, manifest, manifest['format']), sizes,
+        flatatt(attrs),
+    )
@@ -0,0 +1,18 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.page_cache import HOLE
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def personal(context, template_name):
+    """Include a per-user template, or leave a hole for it when the page
+    is rendered for the shared cache.
+    """
+    request = context.get('request')
+    if getattr(request, 'punch_holes', False):
+        return mark_safe(HOLE.format(template_name))
+    return context.template.engine.get_template(
+        template_name).render(context)
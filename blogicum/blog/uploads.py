@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from .constants import IMAGE_UPLOAD_MAX_BYTES
+
+
+def max_upload_bytes():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_BYTES', IMAGE_UPLOAD_MAX_BYTES)
+
+
+class BoundedUploadHandler(TemporaryFileUploadHandler):
+    """Stream every upload to a temporary file, never into memory.
+
+    Bytes past settings.IMAGE_UPLOAD_MAX_BYTES are read off the socket and
+    dropped; the file is flagged ``oversized`` for the form to reject.
+    Every form taking a file must therefore use forms.BoundedImageField,
+    the site's PostForm and the admin's Post form do.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.file.oversized = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_upload_bytes():
+            self.file.oversized = True
+            return None
+        return super().receive_data_chunk(raw_data, start)
@@ -1,8 +1,10 @@
-from django.urls import path
+import re
+
+from django.urls import path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 
 from . import views
+from .media import serve_media
 
 app_name = 'blog'
 
@@ -10,6 +12,8 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('category/<slug:slug>/', views.category_posts, name='category_posts'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments, name='post_comments'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/create/', views.create_post, name='create_post'),
     path('posts/<int:post_id>/edit/', views.edit_post, name='edit_post'),
@@ -21,5 +25,8 @@ urlpatterns = [
          views.edit_comment, name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
          views.delete_comment, name='delete_comment'),
-
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    re_path(
+        rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.+)$',
+        serve_media,
+    ),
+]
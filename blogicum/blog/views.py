@@ -1,30 +1,40 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
 from django.contrib.auth.models import User
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
 from .models import Post, Category, Comment
+from .conditional import FEED_TAGS, conditional_page, post_detail_tags
 from .forms import PostForm, CommentForm, ProfileEditForm
-from .constants import LIST_PER_PAGE
-from .querysets import get_published_posts, comment_count
-
-
+from .page_cache import (add_cache_tags, add_feed_tags, cache_anonymous_page,
+                         cache_shared_page, post_tags)
+from .paginators import paginate, paginate_comments
+from .querysets import (PROFILE_FIELDS, get_cached_object_or_404,
+                        get_published_posts, get_visible_posts,
+                        select_feed_related)
+from .query_budget import query_budget
+
+
+@query_budget(queries=4, time_ms=50)
+@conditional_page(FEED_TAGS)
+@cache_shared_page
 def index(request):
     template = 'blog/index.html'
-    posts = comment_count(get_published_posts())
-    paginator = Paginator(posts, LIST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    posts = get_published_posts()
+    page_obj = paginate(request, posts, 'index')
+    add_feed_tags(request, page_obj)
     context = {
         'page_obj': page_obj,
     }
     return render(request, template, context)
 
 
+@query_budget(queries=5, time_ms=50)
+@conditional_page(FEED_TAGS)
+@cache_shared_page
 def category_posts(request, slug):
     template = 'blog/category.html'
-    category = get_object_or_404(
+    category = get_cached_object_or_404(
         Category,
         slug=slug,
         is_published=True,
@@ -34,9 +44,8 @@ def category_posts(request, slug):
         category=category,
     )
 
-    paginator = Paginator(posts, LIST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, posts, f'category:{category.pk}')
+    add_feed_tags(request, page_obj, f'category:{category.pk}')
     context = {
         'category': category,
         'page_obj': page_obj,
@@ -44,13 +53,15 @@ def category_posts(request, slug):
     return render(request, template, context)
 
 
+@query_budget(queries=4, time_ms=50)
+@conditional_page(post_detail_tags)
+@cache_anonymous_page
 def post_detail(request, post_id):
-
-    post = Post.objects.filter(pk=post_id, author=request.user).first()
-    if not post:
-        post = get_object_or_404(get_published_posts(), pk=post_id)
-
-    comments = post.comments.all()
+    post = get_object_or_404(get_visible_posts(request.user), pk=post_id)
+    comments = paginate_comments(post, request.GET.get('comments'))
+    add_cache_tags(request, *post_tags(post), *(
+        f'user:{comment.author_id}' for comment in comments
+    ))
     form = CommentForm()
 
     context = {
@@ -62,6 +73,17 @@ def post_detail(request, post_id):
     return render(request, 'blog/detail.html', context)
 
 
+@query_budget(queries=4, time_ms=50)
+def post_comments(request, post_id):
+    post = get_object_or_404(get_visible_posts(request.user), pk=post_id)
+    context = {
+        'post': post,
+        'comments': paginate_comments(post, request.GET.get('cursor')),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+@query_budget(queries=6, time_ms=100)
 @login_required
 def create_post(request):
     if request.method == 'POST':
@@ -77,6 +99,7 @@ def create_post(request):
     return render(request, 'blog/create.html', {'form': form})
 
 
+@query_budget(queries=7, time_ms=100)
 @login_required
 def edit_post(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -94,6 +117,7 @@ def edit_post(request, post_id):
     return render(request, 'blog/create.html', {'form': form})
 
 
+@query_budget(queries=7, time_ms=100)
 @login_required
 def delete_post(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -106,20 +130,20 @@ def delete_post(request, post_id):
                   {'form': PostForm(instance=post)})
 
 
+@query_budget(queries=5, time_ms=50)
+@conditional_page(FEED_TAGS)
 def profile(request, username):
-    user = get_object_or_404(User, username=username)
+    user = get_cached_object_or_404(
+        User, fields=PROFILE_FIELDS, username=username)
 
     if request.user == user:
         is_owner = True
-        posts = user.posts.order_by('-pub_date')
+        posts = select_feed_related(user.posts.order_by('-pub_date'))
     else:
         is_owner = False
         posts = get_published_posts().filter(author=user)
 
-    posts = comment_count(posts)
-    paginator = Paginator(posts, LIST_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    page_obj = paginate(request, posts, f'profile:{user.pk}:{is_owner}')
 
     context = {
         'profile': user,
@@ -130,6 +154,7 @@ def profile(request, username):
     return render(request, 'blog/profile.html', context)
 
 
+@query_budget(queries=4, time_ms=100)
 @login_required
 def edit_profile(request):
     if request.method == 'POST':
@@ -143,6 +168,7 @@ def edit_profile(request):
     return render(request, 'blog/user.html', {'form': form})
 
 
+@query_budget(queries=5, time_ms=100)
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(get_published_posts(), pk=post_id)
@@ -162,6 +188,7 @@ def add_comment(request, post_id):
     return render(request, 'includes/comments.html', context)
 
 
+@query_budget(queries=5, time_ms=100)
 @login_required
 def edit_comment(request, post_id, comment_id):
     comment = get_object_or_404(Comment, pk=comment_id, post_id=post_id)
@@ -178,6 +205,7 @@ def edit_comment(request, post_id, comment_id):
     return render(request, 'blog/comment.html', context)
 
 
+@query_budget(queries=5, time_ms=100)
 @login_required
 def delete_comment(request, post_id, comment_id):
     comment = get_object_or_404(Comment, pk=comment_id, post_id=post_id)
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.query_budget.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -44,6 +45,67 @@ MIDDLEWARE = [
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# What QueryBudgetMiddleware does when a view overspends its SQL budget:
+# 'log', 'raise' or None to switch the check off.
+QUERY_BUDGET_MODE = 'log' if DEBUG else None
+
+# The blog caches are invalidated by bumping tag versions stored in the
+# cache itself, so every web worker and the release_posts process must see
+# the same cache: a per-process LocMemCache would keep other workers
+# serving pages an edit has changed. FileBasedCache is shared by the
+# processes of one host and keeps invalidation correct, but its add() and
+# incr() are not atomic: two workers may both recompute a stale key and
+# the page cache counters may miss hits. Use Memcached or Redis for
+# single-flight fills and exact counters, and across hosts.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Cache alias for the blog's page, fragment and query caches.
+BLOG_CACHE = 'default'
+
+# How long after it went stale a cached page, fragment or query result may
+# still be served while another request is computing the fresh one.
+BLOG_CACHE_STALE_SECONDS = 30
+
+# What happens when a page touches a column its queryset deferred and
+# Django fetches it row by row: 'log', 'raise' or None.
+DEFERRED_FIELD_MODE = 'log' if DEBUG else None
+
+# Feed pagination: 'offset' for numbered pages, 'cursor' for keyset
+# pages addressed by opaque tokens (no COUNT, no OFFSET).
+FEED_PAGINATION = 'offset'
+
+# Count offset-paginated feeds only up to this many posts and cap the page
+# links there; None counts exactly.
+FEED_COUNT_ESTIMATE_LIMIT = None
+
+# Uploads always go to a temporary file in chunks; the post form rejects
+# files over IMAGE_UPLOAD_MAX_BYTES and images over IMAGE_UPLOAD_MAX_PIXELS
+# before decoding them.
+FILE_UPLOAD_HANDLERS = ['blog.uploads.BoundedUploadHandler']
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_UPLOAD_MAX_PIXELS = 40_000_000
+
+# How post image variants are built: 'pool' hands them to a pool of
+# IMAGE_JOB_WORKERS processes after the upload is saved, 'inline' builds
+# them during the request.
+IMAGE_JOB_MODE = 'pool'
+IMAGE_JOB_WORKERS = 2
+
+# Scheduled posts only enter the feeds once something releases them.
+# With POST_RELEASE_LOOP a thread inside each web process does; without
+# it `manage.py release_posts --loop` must run as a separate process (or
+# `manage.py release_posts` from cron), or scheduled posts never appear;
+# the blog.W001 warning says so until it is silenced. The separate process
+# needs a cache shared with the web workers, see CACHES; startup fails
+# with blog.E001 on a per-process one.
+POST_RELEASE_LOOP = False
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -138,5 +200,12 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Who sends media files: None streams them from Django (FileResponse,
+# ranges, conditional GET); 'x-accel-redirect' hands them to nginx under
+# MEDIA_ACCEL_PREFIX (an `internal` location aliased to MEDIA_ROOT);
+# 'x-sendfile' to Apache or lighttpd.
+MEDIA_SERVE_MODE = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = '/'
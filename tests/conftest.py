@@ -3,6 +3,7 @@ import re
 import time
 from http import HTTPStatus
 from inspect import getsource
+from io import BytesIO
 from pathlib import Path
 from typing import (
     Iterable,
@@ -19,12 +20,14 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
 from django.test import override_settings
 from django.test.client import Client
 from mixer.backend.django import mixer as _mixer
+from PIL import Image
 
 N_PER_FIXTURE = 3
 N_PER_PAGE = 10
@@ -41,6 +44,23 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def run_image_jobs_inline():
+    with override_settings(IMAGE_JOB_MODE='inline'):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    with override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}):
+        cache.clear()
+        yield
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -133,6 +153,27 @@ def another_user_client(another_user):
     return client
 
 
+@pytest.fixture
+def post(mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        location=published_location, image=None,
+    )
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=str(tmp_path)):
+        yield tmp_path
+
+
+def image_file(size=(60, 40), color=(73, 109, 137), image_format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=color).save(buffer, image_format)
+    return ContentFile(
+        buffer.getvalue(), name=f'photo.{image_format.lower()}')
+
+
 def get_post_list_context_key(
         user_client, page_url, page_load_err_msg, key_missing_msg
 ):
@@ -363,6 +404,8 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
+                    or filename.endswith(".json")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
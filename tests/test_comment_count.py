@@ -0,0 +1,50 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_new_post_has_no_comments(mixer):
+    post = mixer.blend('blog.Post')
+    assert post.comment_count == 0
+
+
+def test_comment_count_follows_comments(
+        mixer, user_client, post_with_published_location):
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    comment = mixer.blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что счётчик комментариев публикации увеличивается при'
+        ' добавлении комментария.'
+    )
+
+    comment.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что счётчик комментариев публикации уменьшается при'
+        ' удалении комментария.'
+    )
+
+
+def test_comment_moved_to_another_post(mixer, post_with_published_location):
+    post = post_with_published_location
+    other_post = mixer.blend('blog.Post')
+    comment = mixer.blend('blog.Comment', post=post)
+    comment.post = other_post
+    comment.save()
+    post.refresh_from_db()
+    other_post.refresh_from_db()
+    assert (post.comment_count, other_post.comment_count) == (0, 1)
+
+
+def test_recount_comments_repairs_drift(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=42)
+    call_command('recount_comments', batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3
@@ -0,0 +1,28 @@
+import re
+
+import pytest
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def csrf_client(user):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    return client
+
+
+def test_comment_form_works_without_javascript(csrf_client, post):
+    content = csrf_client.get(f'/posts/{post.id}/').content.decode()
+    token = re.search(
+        r'name="csrfmiddlewaretoken" value="([^"]+)"', content)
+    assert token, (
+        'Убедитесь, что форма комментария содержит CSRF-токен.'
+    )
+    response = csrf_client.post(
+        f'/posts/{post.id}/comment/',
+        {'text': 'Комментарий', 'csrfmiddlewaretoken': token.group(1)},
+    )
+    assert response.status_code == 302
+    assert post.comments.count() == 1
@@ -0,0 +1,68 @@
+import pytest
+from django.test import RequestFactory
+
+from blog.caching import get_cache
+from blog.page_cache import _page_key
+from blog.query_budget import count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+
+def page_urls(post):
+    return ('/', f'/category/{post.category.slug}/',
+            f'/profile/{post.author.username}/', f'/posts/{post.id}/')
+
+
+@pytest.mark.parametrize('client_name', ['user_client', 'unlogged_client'])
+def test_unchanged_pages_revalidate_without_sql(request, client_name, post):
+    client = request.getfixturevalue(client_name)
+    for url in page_urls(post):
+        etag = client.get(url)['ETag']
+        with count_queries() as counter:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Убедитесь, что страница `{url}` отвечает 304, если не'
+            ' изменилась с прошлого запроса.'
+        )
+        assert counter.queries <= 2
+
+
+def test_anonymous_pages_honour_if_modified_since(unlogged_client, post):
+    for url in page_urls(post):
+        last_modified = unlogged_client.get(url)['Last-Modified']
+        response = unlogged_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 304
+
+
+def test_comment_changes_validators(mixer, user_client, post):
+    urls = page_urls(post)
+    etags = [user_client.get(url)['ETag'] for url in urls]
+    mixer.blend('blog.Comment', post=post)
+    for url, etag in zip(urls, etags):
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Убедитесь, что новый комментарий меняет ETag страницы `{url}`.'
+        )
+
+
+def test_etag_differs_between_users(user_client, another_user_client, post):
+    url = f'/posts/{post.id}/'
+    assert user_client.get(url)['ETag'] != another_user_client.get(
+        url)['ETag'], (
+        'Убедитесь, что ETag страницы зависит от пользователя.'
+    )
+
+
+def test_stale_page_carries_no_validators(mixer, unlogged_client, post):
+    url = f'/posts/{post.id}/'
+    unlogged_client.get(url)
+    mixer.blend('blog.Comment', post=post)
+    get_cache().add(f'{_page_key(RequestFactory().get(url))}:lock', 1)
+    response = unlogged_client.get(url)
+    assert response['X-Page-Cache'] == 'STALE'
+    assert not response.has_header('ETag') and not response.has_header(
+        'Last-Modified'), (
+        'Убедитесь, что устаревшая копия страницы отдаётся без ETag и'
+        ' Last-Modified.'
+    )
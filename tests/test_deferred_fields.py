@@ -0,0 +1,26 @@
+import pytest
+from django.test import override_settings
+
+from blog.models import DeferredFieldLoaded
+from blog.querysets import get_published_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(DEFERRED_FIELD_MODE='raise')
+@pytest.mark.parametrize('client_name', ['user_client', 'unlogged_client'])
+def test_pages_do_not_load_deferred_fields(request, client_name, post):
+    client = request.getfixturevalue(client_name)
+    for url in ('/', f'/category/{post.category.slug}/',
+                f'/profile/{post.author.username}/', f'/posts/{post.id}/'):
+        assert client.get(url).status_code == 200, (
+            f'Убедитесь, что страница `{url}` не обращается к полям,'
+            ' которые её запрос не загрузил.'
+        )
+
+
+@override_settings(DEFERRED_FIELD_MODE='raise')
+def test_deferred_field_access_is_reported(post):
+    card = get_published_posts().get(pk=post.pk)
+    with pytest.raises(DeferredFieldLoaded):
+        card.text
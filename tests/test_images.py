@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import is_pending, read_manifest, variant_name
+from blog.jobs import finish_job, process_image
+from blog.templatetags.images import responsive_image
+from conftest import image_file
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures('media_root')]
+
+
+@pytest.fixture
+def photo_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=image_file((2000, 1000)),
+    )
+
+
+def test_variants_are_resized(photo_post):
+    image = photo_post.image
+    manifest = read_manifest(image.storage, image.name)
+    assert manifest == {'widths': [320, 640, 1280], 'format': 'jpg'}
+    for width in manifest['widths']:
+        for ext in ('jpg', 'webp'):
+            with image.storage.open(
+                    variant_name(image.name, width, ext)) as file:
+                assert Image.open(file).size == (width, width // 2), (
+                    'Убедитесь, что варианты картинки уменьшены до заданной'
+                    ' ширины с сохранением пропорций.'
+                )
+
+
+def test_small_images_are_not_upscaled(mixer, user):
+    post = mixer.blend('blog.Post', author=user, image=image_file((100, 80)))
+    assert read_manifest(post.image.storage, post.image.name)['widths'] == [
+        100]
+
+
+def test_cards_emit_srcset(user_client, photo_post):
+    content = user_client.get('/').content.decode()
+    assert content.count('<img') == 2  # the logo and the post image
+    assert '<source type="image/webp" srcset="' in content
+    assert '-1280.webp 1280w' in content and '-320.jpg 320w' in content, (
+        'Убедитесь, что карточка публикации перечисляет уменьшенные'
+        ' варианты картинки в `srcset`.'
+    )
+
+
+def test_unreadable_image_falls_back_to_original(mixer, user):
+    post = mixer.blend(
+        'blog.Post', author=user,
+        image=ContentFile(b'not an image', name='broken.jpg'),
+    )
+    assert post.image_jobs.get().status == 'failed'
+    assert read_manifest(post.image.storage, post.image.name) is None
+
+
+def test_failed_images_are_retried_only_on_request(mixer, user):
+    post = mixer.blend(
+        'blog.Post', author=user,
+        image=ContentFile(b'not an image', name='broken.jpg'),
+    )
+    for _ in range(3):
+        call_command('process_images', stdout=StringIO())
+    assert post.image_jobs.count() == 1, (
+        'Убедитесь, что `process_images` не обрабатывает заново'
+        ' картинки, обработка которых не удалась.'
+    )
+    call_command('process_images', retry_failed=True, stdout=StringIO())
+    assert post.image_jobs.count() == 2
+
+
+def test_upload_is_processed_by_a_job(photo_post):
+    job = photo_post.image_jobs.get()
+    assert job.status == job.DONE and job.finished_at, (
+        'Убедитесь, что загруженная картинка обрабатывается задачей.'
+    )
+
+
+@override_settings(IMAGE_JOB_MODE='pool')
+def test_card_shows_placeholder_until_job_finishes(
+        user_client, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        image=image_file((800, 600)),
+    )
+    job = post.image_jobs.get()
+    assert job.status == job.PENDING
+    assert 'Картинка обрабатывается' in user_client.get('/').content.decode()
+    process_image(job.image)
+    finish_job(job)
+    content = user_client.get('/').content.decode()
+    assert 'Картинка обрабатывается' not in content
+    assert '-640.webp 640w' in content, (
+        'Убедитесь, что после обработки карточка показывает варианты'
+        ' картинки.'
+    )
+
+
+def test_lost_jobs_are_requeued(mixer, user):
+    with override_settings(IMAGE_JOB_MODE='pool'):
+        post = mixer.blend('blog.Post', author=user,
+                           image=image_file((800, 600)))
+    job = post.image_jobs.get()
+    call_command('process_images', stdout=StringIO())
+    job.refresh_from_db()
+    assert job.status == job.PENDING
+    type(job).objects.filter(pk=job.pk).update(
+        queued_at=timezone.now() - timedelta(hours=1))
+    call_command('process_images', stdout=StringIO())
+    job.refresh_from_db()
+    assert job.status == job.DONE, (
+        'Убедитесь, что зависшие задачи обработки картинок'
+        ' ставятся в очередь заново.'
+    )
+    assert not is_pending(post.image.storage, post.image.name)
+
+
+def test_manifest_lookup_is_cached(photo_post, monkeypatch):
+    reads = []
+    monkeypatch.setattr(
+        'blog.templatetags.images.read_manifest',
+        lambda *args: reads.append(args) or read_manifest(*args))
+    for _ in range(2):
+        assert '-640.webp' in responsive_image(photo_post.image)
+    assert len(reads) == 1, (
+        'Убедитесь, что манифест вариантов картинки читается из кэша.'
+    )
@@ -0,0 +1,101 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def media_file(media_root):
+    (media_root / 'docs').mkdir()
+    (media_root / 'docs' / 'file.bin').write_bytes(CONTENT)
+
+
+URL = '/media/docs/file.bin'
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_media_is_served_with_validators(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+    assert response['Accept-Ranges'] == 'bytes'
+    revalidated = client.get(URL, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert revalidated.status_code == 304, (
+        'Убедитесь, что неизменённый медиафайл отдаётся ответом 304.'
+    )
+
+
+@pytest.mark.parametrize('header, start, end', [
+    ('bytes=0-99', 0, 99),
+    ('bytes=1000-', 1000, 1023),
+    ('bytes=-24', 1000, 1023),
+    ('bytes=1000-5000', 1000, 1023),
+])
+def test_media_range_requests(client, header, start, end):
+    response = client.get(URL, HTTP_RANGE=header)
+    assert response.status_code == 206, (
+        'Убедитесь, что медиафайлы поддерживают запросы диапазонов.'
+    )
+    assert response['Content-Range'] == f'bytes {start}-{end}/1024'
+    assert body(response) == CONTENT[start:end + 1]
+
+
+def test_unsatisfiable_range(client):
+    response = client.get(URL, HTTP_RANGE='bytes=2000-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == 'bytes */1024'
+
+
+def test_stale_if_range_gets_whole_file(client):
+    response = client.get(
+        URL, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+    assert response.status_code == 200
+    assert body(response) == CONTENT
+
+
+@pytest.mark.parametrize('url', [
+    '/media/docs/missing.bin', '/media/../settings.py', '/media/docs/',
+])
+def test_media_outside_files_not_found(client, url):
+    assert client.get(url).status_code == 404
+
+
+@override_settings(MEDIA_SERVE_MODE='x-accel-redirect')
+def test_media_offloaded_to_nginx(client):
+    response = client.get(URL)
+    assert response['X-Accel-Redirect'] == '/protected-media/docs/file.bin', (
+        'Убедитесь, что передача файла поручается веб-серверу.'
+    )
+    assert response.content == b''
+
+
+@override_settings(MEDIA_SERVE_MODE='x-sendfile')
+def test_media_offloaded_with_sendfile(client, media_root):
+    response = client.get(URL)
+    assert response['X-Sendfile'] == str(media_root / 'docs' / 'file.bin')
+
+
+@override_settings(MEDIA_SERVE_MODE='x-accel-redirect')
+def test_offloaded_path_is_quoted(client, media_root):
+    (media_root / 'docs' / 'фото 1.jpg').write_bytes(CONTENT)
+    response = client.get('/media/docs/фото 1.jpg')
+    assert response['X-Accel-Redirect'] == (
+        '/protected-media/docs/%D1%84%D0%BE%D1%82%D0%BE%201.jpg'), (
+        'Убедитесь, что путь в заголовке для веб-сервера экранирован.'
+    )
+
+
+@pytest.mark.parametrize(
+    'name', ['variants/file.json', 'variants/file.pending'])
+def test_internal_files_are_not_served(client, media_root, name):
+    target = media_root / 'docs' / name
+    target.parent.mkdir()
+    target.write_bytes(b'{}')
+    assert client.get(f'/media/docs/{name}').status_code == 404, (
+        'Убедитесь, что служебные файлы вариантов картинок не отдаются.'
+    )
@@ -0,0 +1,119 @@
+import pytest
+
+from blog.page_cache import page_cache_stats
+from blog.query_budget import count_queries
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def two_posts(mixer, user, published_category, published_locations):
+    return mixer.cycle(2).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=mixer.sequence(*published_locations),
+        image=None,
+    )
+
+
+def cached(client, url):
+    return client.get(url)['X-Page-Cache'] == 'HIT'
+
+
+def test_anonymous_pages_are_cached(unlogged_client, two_posts):
+    post = two_posts[0]
+    for url in ('/', f'/category/{post.category.slug}/', f'/posts/{post.id}/'):
+        first = unlogged_client.get(url)
+        with count_queries() as counter:
+            second = unlogged_client.get(url)
+        assert second['X-Page-Cache'] == 'HIT', (
+            f'Убедитесь, что страница `{url}` для анонимных читателей'
+            ' отдаётся из кэша.'
+        )
+        assert counter.queries == 0
+        assert second.content == first.content
+    assert page_cache_stats() == {'hits': 3, 'misses': 3}
+
+
+def test_personal_pages_are_not_cached(user_client, two_posts):
+    url = f'/posts/{two_posts[0].id}/'
+    user_client.get(url)
+    assert not user_client.get(url).has_header('X-Page-Cache')
+
+
+def test_feeds_are_shared_with_personal_header(
+        user_client, another_user_client, unlogged_client, user,
+        another_user, two_posts):
+    first = unlogged_client.get('/')
+    for client, username in ((user_client, user.username),
+                             (another_user_client, another_user.username)):
+        response = client.get('/')
+        assert response['X-Page-Cache'] == 'HIT', (
+            'Убедитесь, что авторизованные пользователи получают ленту'
+            ' из общего кэша.'
+        )
+        content = response.content.decode()
+        assert f'href="/profile/{username}/">{username}</a>' in content, (
+            'Убедитесь, что шапка закэшированной страницы заполняется'
+            ' для текущего пользователя.'
+        )
+        assert 'personal:' not in content
+    assert 'Регистрация' in first.content.decode()
+
+
+def test_comment_invalidates_only_dependent_pages(
+        mixer, unlogged_client, two_posts):
+    commented, other = two_posts
+    urls = ['/', f'/posts/{commented.id}/', f'/posts/{other.id}/']
+    for url in urls:
+        unlogged_client.get(url)
+    mixer.blend('blog.Comment', post=commented)
+    assert not cached(unlogged_client, '/')
+    assert not cached(unlogged_client, f'/posts/{commented.id}/')
+    assert cached(unlogged_client, f'/posts/{other.id}/'), (
+        'Убедитесь, что комментарий сбрасывает в кэше только страницы,'
+        ' на которых показана прокомментированная публикация.'
+    )
+
+
+def test_location_rename_invalidates_pages_showing_it(
+        unlogged_client, two_posts):
+    renamed, other = two_posts
+    for post in two_posts:
+        unlogged_client.get(f'/posts/{post.id}/')
+    renamed.location.name = 'Новое место'
+    renamed.location.save()
+    response = unlogged_client.get(f'/posts/{renamed.id}/')
+    assert response['X-Page-Cache'] == 'MISS'
+    assert 'Новое место' in response.content.decode()
+    assert cached(unlogged_client, f'/posts/{other.id}/')
+
+
+def test_new_post_invalidates_feed(mixer, unlogged_client, two_posts):
+    unlogged_client.get('/')
+    post = mixer.blend(
+        'blog.Post', category=two_posts[0].category, image=None)
+    response = unlogged_client.get('/')
+    assert response['X-Page-Cache'] == 'MISS'
+    assert post.title in response.content.decode()
+
+
+def test_post_cards_are_cached_per_version(user_client, user, two_posts):
+    post = two_posts[0]
+    user_client.get('/')
+    type(post).objects.filter(pk=post.pk).update(text='Тайком изменённый')
+    assert 'Тайком изменённый' not in user_client.get('/').content.decode(), (
+        'Убедитесь, что карточки публикаций кэшируются целиком.'
+    )
+    user.username = 'renamed_author'
+    user.save()
+    content = user_client.get('/').content.decode()
+    assert '@renamed_author' in content, (
+        'Убедитесь, что смена имени автора обновляет его карточки.'
+    )
+    post.refresh_from_db()
+    post.save()
+    assert 'Тайком изменённый' in user_client.get('/').content.decode(), (
+        'Убедитесь, что изменение публикации обновляет её карточку.'
+    )
@@ -0,0 +1,164 @@
+from datetime import timedelta
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.query_budget import count_queries
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, published_location):
+    now = timezone.now()
+    same_time = now - timedelta(days=1)
+    pub_dates = [now - timedelta(hours=i) for i in range(N_PER_PAGE * 2)]
+    pub_dates += [same_time] * (N_PER_PAGE + 3)
+    return mixer.cycle(len(pub_dates)).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(pub_date for pub_date in pub_dates),
+        image=None,
+    )
+
+
+def walk(client, url, cursor_key):
+    seen, pages, cursor = [], [], None
+    while True:
+        response = client.get(url, {'cursor': cursor or ''})
+        page = response.context['page_obj']
+        pages.append([post.id for post in page])
+        seen.extend(pages[-1])
+        cursor = getattr(page, cursor_key)
+        if cursor is None:
+            return seen, pages, page
+
+
+@override_settings(FEED_PAGINATION='cursor')
+def test_cursor_pages_cover_feed_once(user_client, feed_posts):
+    expected = [
+        post.id for post in sorted(
+            feed_posts, key=lambda post: (post.pub_date, post.id),
+            reverse=True,
+        )
+    ]
+    seen, pages, last_page = walk(user_client, '/', 'next_cursor')
+    assert seen == expected, (
+        'Убедитесь, что курсорная пагинация выдаёт каждую публикацию ровно'
+        ' один раз в порядке «от новых к старым», в том числе публикации'
+        ' с одинаковой датой.'
+    )
+    assert all(len(page) <= N_PER_PAGE for page in pages)
+
+    response = user_client.get('/', {'cursor': last_page.previous_cursor})
+    assert [post.id for post in response.context['page_obj']] == pages[-2], (
+        'Убедитесь, что ссылка на предыдущую страницу курсорной пагинации'
+        ' возвращает предыдущую страницу.'
+    )
+
+
+def test_offset_pagination_is_default(user_client, feed_posts):
+    response = user_client.get('/', {'page': 2})
+    assert response.context['page_obj'].number == 2
+
+
+@override_settings(FEED_PAGINATION='cursor')
+def test_broken_cursor_shows_first_page(user_client, feed_posts):
+    first = user_client.get('/').context['page_obj']
+    response = user_client.get('/', {'cursor': 'garbage'})
+    assert response.status_code == 200
+    assert list(response.context['page_obj']) == list(first)
+    assert not response.context['page_obj'].has_previous()
+
+
+def test_feed_count_is_cached(user_client, feed_posts):
+    with count_queries() as cold:
+        user_client.get('/', {'page': 2})
+    with count_queries() as warm:
+        user_client.get('/', {'page': 1})
+    assert warm.queries == cold.queries - 1, (
+        'Убедитесь, что число публикаций в ленте берётся из кэша.'
+    )
+
+    count = user_client.get('/').context['page_obj'].paginator.count
+    feed_posts[0].delete()
+    assert user_client.get('/').context['page_obj'].paginator.count == (
+        count - 1
+    ), 'Убедитесь, что кэш числа публикаций сбрасывается при их изменении.'
+
+
+@override_settings(FEED_COUNT_ESTIMATE_LIMIT=N_PER_PAGE * 2)
+def test_estimated_count_caps_page_links(user_client, feed_posts):
+    paginator = user_client.get('/').context['page_obj'].paginator
+    assert paginator.count == N_PER_PAGE * 2
+    assert paginator.count_is_estimate
+    assert paginator.num_pages == 2
+
+
+@override_settings(FEED_COUNT_ESTIMATE_LIMIT=N_PER_PAGE * 2)
+def test_pages_past_estimate_are_reachable(user_client, feed_posts):
+    page_obj = user_client.get('/', {'page': 2}).context['page_obj']
+    assert page_obj.has_next(), (
+        'Убедитесь, что за последней оценённой страницей можно перейти'
+        ' к следующей.'
+    )
+    page_obj = user_client.get('/', {'page': 4}).context['page_obj']
+    assert page_obj.number == 4 and len(page_obj) == 3
+    assert not page_obj.has_next()
+    assert page_obj.elided_page_range[-1] == 4
+    assert user_client.get('/', {'page': 5}).status_code == 200
+
+
+def test_page_links_are_windowed(user_client, feed_posts, monkeypatch):
+    monkeypatch.setattr('blog.paginators.LIST_PER_PAGE', 1)
+    response = user_client.get('/', {'page': 12})
+    page_obj = response.context['page_obj']
+    assert page_obj.paginator.num_pages == len(feed_posts)
+    links = response.content.decode().count('class="page-link"')
+    assert links < 15, (
+        'Убедитесь, что пагинатор выводит ссылки только на первую, последнюю'
+        ' и соседние с текущей страницы.'
+    )
+    assert page_obj.elided_page_range[0] == 1
+    assert page_obj.elided_page_range[-1] == len(feed_posts)
+    assert page_obj.paginator.ELLIPSIS in page_obj.elided_page_range
+
+
+def test_comments_are_paginated(
+        mixer, user_client, unlogged_client, post_with_published_location):
+    from blog.constants import COMMENTS_PER_PAGE
+
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PER_PAGE * 2 + 5).blend(
+        'blog.Comment', post=post)
+    response = user_client.get(f'/posts/{post.id}/')
+    page = response.context['comments']
+    assert len(page) == COMMENTS_PER_PAGE, (
+        'Убедитесь, что на странице публикации комментарии выводятся'
+        ' частями.'
+    )
+    seen = [comment.id for comment in page]
+    cursor = page.next_cursor
+    while cursor:
+        response = unlogged_client.get(
+            f'/posts/{post.id}/comments/', {'cursor': cursor})
+        assert response.status_code == 200
+        page = response.context['comments']
+        seen.extend(comment.id for comment in page)
+        cursor = page.next_cursor
+    assert seen == [comment.id for comment in comments], (
+        'Убедитесь, что подгрузка комментариев выдаёт каждый комментарий'
+        ' ровно один раз в порядке их добавления.'
+    )
+
+
+def test_comments_of_hidden_post_are_not_served(
+        mixer, unlogged_client, future_posts):
+    post = future_posts[0]
+    mixer.blend('blog.Comment', post=post)
+    response = unlogged_client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == 404
@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.query_budget import count_queries
+from blog.urls import app_name, urlpatterns
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_POSTS = N_PER_PAGE * 3
+N_COMMENTS = 15
+
+
+@pytest.fixture
+def seeded_blog(mixer, user, another_user):
+    categories = mixer.cycle(3).blend('blog.Category', is_published=True)
+    locations = mixer.cycle(3).blend('blog.Location', is_published=True)
+    now = timezone.now()
+    posts = mixer.cycle(N_POSTS).blend(
+        'blog.Post',
+        author=mixer.sequence(user, another_user),
+        category=mixer.sequence(*categories),
+        location=mixer.sequence(*locations),
+        pub_date=(now - timedelta(hours=i) for i in range(N_POSTS)),
+        image=None,
+    )
+    post = posts[0]
+    comments = mixer.cycle(N_COMMENTS).blend(
+        'blog.Comment',
+        post=post,
+        author=mixer.sequence(user, another_user),
+    )
+    return {
+        'slug': post.category.slug,
+        'post_id': post.id,
+        'username': user.username,
+        'comment_id': comments[0].id,
+    }
+
+
+def blog_urls(seeded_blog):
+    for pattern in urlpatterns:
+        if not pattern.name:
+            continue
+        kwargs = {
+            name: seeded_blog[name]
+            for name in pattern.pattern.converters
+        }
+        yield pattern, reverse(f'{app_name}:{pattern.name}', kwargs=kwargs)
+
+
+def test_every_view_declares_budget():
+    for pattern in urlpatterns:
+        if not pattern.name:
+            continue
+        assert getattr(pattern.callback, 'query_budget', None), (
+            f'Объявите бюджет SQL-запросов для view-функции '
+            f'`{pattern.name}` с помощью декоратора `query_budget`.'
+        )
+
+
+@pytest.mark.parametrize('client_name', ['user_client', 'unlogged_client'])
+def test_views_stay_within_budget(request, client_name, seeded_blog):
+    client = request.getfixturevalue(client_name)
+    for pattern, url in blog_urls(seeded_blog):
+        budget = pattern.callback.query_budget
+        with override_settings(QUERY_BUDGET_MODE='raise'):
+            with count_queries() as counter:
+                response = client.get(url, {'page': 2})
+        assert response.status_code < 500
+        assert not budget.violations(counter), (
+            f'Страница `{url}` превысила бюджет SQL-запросов: '
+            f'{"; ".join(budget.violations(counter))}.'
+        )
+
+
+def test_feed_queries_do_not_grow_with_page_size(
+        user_client, seeded_blog):
+    counts = []
+    for per_page in (N_PER_PAGE, N_POSTS):
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr('blog.paginators.LIST_PER_PAGE', per_page)
+            cache.clear()
+            with count_queries() as counter:
+                user_client.get(reverse('blog:index'))
+        counts.append(counter.queries)
+    assert counts[0] == counts[1], (
+        'Убедитесь, что число SQL-запросов ленты не зависит '
+        'от количества публикаций на странице.'
+    )
+
+
+def test_post_detail_queries_do_not_grow_with_comments(
+        mixer, user_client, seeded_blog):
+    counts = []
+    for _ in range(2):
+        with count_queries() as counter:
+            user_client.get(reverse(
+                'blog:post_detail', args=[seeded_blog['post_id']]))
+        counts.append(counter.queries)
+        mixer.cycle(N_COMMENTS).blend(
+            'blog.Comment', post_id=seeded_blog['post_id'])
+    assert counts[0] == counts[1], (
+        'Убедитесь, что число SQL-запросов страницы публикации не зависит'
+        ' от количества комментариев.'
+    )
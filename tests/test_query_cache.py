@@ -0,0 +1,87 @@
+import pytest
+from django.http import Http404
+from django.test import override_settings
+
+from blog.models import Category
+from blog.paginators import paginate_comments
+from blog.query_budget import count_queries
+from blog.querysets import PROFILE_FIELDS, get_cached_object_or_404
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_lookup_is_cached_until_row_changes(published_category):
+    slug = published_category.slug
+    get_cached_object_or_404(Category, slug=slug, is_published=True)
+    with count_queries() as counter:
+        get_cached_object_or_404(Category, slug=slug, is_published=True)
+    assert counter.queries == 0, (
+        'Убедитесь, что категория по слагу берётся из кэша.'
+    )
+    published_category.is_published = False
+    published_category.save()
+    with pytest.raises(Http404):
+        get_cached_object_or_404(Category, slug=slug, is_published=True)
+
+
+def test_missing_lookup_is_dropped_by_new_rows(mixer):
+    with pytest.raises(Http404):
+        get_cached_object_or_404(Category, slug='new-slug')
+    mixer.blend('blog.Category', slug='new-slug')
+    assert get_cached_object_or_404(Category, slug='new-slug')
+
+
+def test_cached_user_leaves_credentials_out(user):
+    cached = get_cached_object_or_404(
+        type(user), fields=PROFILE_FIELDS, username=user.username)
+    assert {'password', 'email'} <= cached.get_deferred_fields(), (
+        'Убедитесь, что в кэш попадают только поля, нужные странице'
+        ' профиля.'
+    )
+
+
+def test_comment_list_follows_comment_writes(mixer, post):
+    assert len(paginate_comments(post)) == 0
+    with count_queries() as counter:
+        paginate_comments(post)
+    assert counter.queries == 0
+    comment = mixer.blend('blog.Comment', post=post)
+    assert list(paginate_comments(post)) == [comment], (
+        'Убедитесь, что новый комментарий сбрасывает кэш списка'
+        ' комментариев публикации.'
+    )
+
+
+def test_feed_rows_are_cached(user_client, post):
+    url = f'/profile/{post.author.username}/'
+    with count_queries() as cold:
+        user_client.get(url)
+    with count_queries() as warm:
+        user_client.get(url)
+    assert warm.queries < cold.queries
+    post.title = 'Новое название'
+    post.save()
+    assert 'Новое название' in user_client.get(url).content.decode()
+
+
+def test_file_based_cache(tmp_path, published_category):
+    caches = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'blog': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        },
+    }
+    with override_settings(CACHES=caches, BLOG_CACHE='blog'):
+        slug = published_category.slug
+        get_cached_object_or_404(Category, slug=slug)
+        assert any(tmp_path.iterdir()), (
+            'Убедитесь, что кэш блога использует алиас из'
+            ' настройки `BLOG_CACHE`.'
+        )
+        published_category.title = 'Другое название'
+        published_category.save()
+        assert get_cached_object_or_404(
+            Category, slug=slug).title == 'Другое название'
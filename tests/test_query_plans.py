@@ -0,0 +1,68 @@
+import re
+
+import pytest
+from django.db import connection
+
+from django.utils import timezone
+
+from blog.models import Comment
+from blog.paginators import BACKWARD, FORWARD, CursorPaginator
+from blog.querysets import get_published_posts, select_feed_related
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+FULL_SCAN = re.compile(r'\bSCAN (?!.*\bINDEX\b)')
+TEMP_SORT = re.compile(r'TEMP B-TREE FOR ORDER BY')
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def feed_querysets(user):
+    return {
+        'лента': get_published_posts(),
+        'лента категории': get_published_posts().filter(category_id=1),
+        'лента автора': get_published_posts().filter(author=user),
+        'профиль владельца': select_feed_related(
+            user.posts.order_by('-pub_date')),
+        'комментарии к посту': Comment.objects.filter(post_id=1),
+    }
+
+
+def cursor_querysets(user):
+    key = [timezone.now(), 1]
+    for name, queryset in feed_querysets(user).items():
+        ordering = ('-pub_date', '-id')
+        if queryset.model is Comment:
+            ordering = ('created_at', 'id')
+        paginator = CursorPaginator(queryset, N_PER_PAGE, ordering=ordering)
+        for direction in (FORWARD, BACKWARD):
+            yield (f'{name}, курсор {direction}',
+                   paginator.page_queryset(direction, key))
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Проверяются планы запросов SQLite.'
+)
+def test_feed_queries_use_indexes(user):
+    querysets = [
+        (name, queryset[:N_PER_PAGE])
+        for name, queryset in feed_querysets(user).items()
+    ]
+    querysets.extend(cursor_querysets(user))
+    for name, queryset in querysets:
+        plan = explain(queryset)
+        for step in plan:
+            assert not FULL_SCAN.search(step), (
+                f'Запрос «{name}» выполняет полный просмотр таблицы: {plan}.'
+            )
+            assert not TEMP_SORT.search(step), (
+                f'Запрос «{name}» сортирует строки во временном B-дереве '
+                f'вместо чтения индекса: {plan}.'
+            )
@@ -0,0 +1,52 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+TEXT = 'Первая строка <b>жирно</b>\nвторая строка ' + 'слово ' * 20
+
+
+@pytest.fixture
+def long_post(mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        text=TEXT, image=None,
+    )
+
+
+def test_post_stores_excerpt_and_html(long_post):
+    assert long_post.excerpt.endswith('…')
+    assert len(long_post.excerpt.split()) == 11, (
+        'Убедитесь, что анонс публикации содержит первые 10 слов текста.'
+    )
+    assert long_post.text_html.startswith(
+        'Первая строка &lt;b&gt;жирно&lt;/b&gt;<br>вторая строка'), (
+        'Убедитесь, что HTML текста публикации экранирован, а переносы'
+        ' строк заменены на `<br>`.'
+    )
+
+
+def test_feeds_do_not_load_full_text(user_client, long_post):
+    table = long_post._meta.db_table
+    with CaptureQueriesContext(connection) as queries:
+        content = user_client.get('/').content.decode()
+    assert 'вторая строка слово слово слово слово слово …' in content
+    assert not any(
+        f'"{table}"."text",' in query['sql'] for query in queries
+    ), 'Убедитесь, что ленты не загружают полный текст публикаций.'
+
+
+def test_render_posts_repairs_stale_rows(long_post):
+    type(long_post).objects.update(excerpt='', text_html='')
+    card_version = long_post.card_version
+    call_command('render_posts', batch_size=1)
+    long_post.refresh_from_db()
+    assert long_post.card_version != card_version, (
+        'Убедитесь, что `render_posts` обновляет версию карточки.'
+    )
+    assert long_post.excerpt and long_post.text_html.startswith(
+        'Первая строка'), (
+        'Убедитесь, что команда `render_posts` пересобирает анонсы и HTML.'
+    )
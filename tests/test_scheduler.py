@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.checks import check_release_cache
+from blog.scheduler import release_due_posts, seconds_to_next_release
+
+pytestmark = [pytest.mark.django_db]
+
+
+def arrive(post):
+    """Move the post's publication time into the past, as time would."""
+    type(post).objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1))
+
+
+def test_scheduled_post_is_released(unlogged_client, future_posts):
+    post = future_posts[0]
+    post.category.is_published = True
+    post.category.save()
+    assert post.title not in unlogged_client.get('/').content.decode()
+
+    arrive(post)
+    assert release_due_posts() == 1
+    post.refresh_from_db()
+    assert post.is_visible
+    response = unlogged_client.get('/')
+    assert response['X-Page-Cache'] == 'MISS', (
+        'Убедитесь, что выход отложенной публикации сбрасывает кэш лент.'
+    )
+    assert post.title in response.content.decode(), (
+        'Убедитесь, что отложенная публикация появляется в ленте после'
+        ' наступления даты публикации.'
+    )
+
+
+def test_unpublished_post_is_not_released(mixer):
+    post = mixer.blend(
+        'blog.Post', is_published=False,
+        pub_date=timezone.now() - timedelta(days=1))
+    assert release_due_posts() == 0
+    post.refresh_from_db()
+    assert not post.is_visible
+
+
+def test_loop_sleeps_until_next_release(future_posts):
+    wait = seconds_to_next_release(interval=10 ** 6)
+    assert 0 < wait <= timedelta(days=1).total_seconds()
+
+
+def test_release_posts_command(future_posts):
+    arrive(future_posts[0])
+    out = StringIO()
+    call_command('release_posts', stdout=out)
+    assert '1' in out.getvalue()
+
+
+def test_release_process_needs_shared_cache(settings):
+    settings.POST_RELEASE_LOOP = False
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+    assert [error.id for error in check_release_cache(None)] == [
+        'blog.E001'], (
+        'Убедитесь, что запуск без общего кеша для release_posts '
+        'останавливается с ошибкой.'
+    )
+    settings.POST_RELEASE_LOOP = True
+    assert not check_release_cache(None)
+
+
+def test_release_process_is_a_reminder_without_loop(settings, tmp_path):
+    settings.POST_RELEASE_LOOP = False
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    assert [error.id for error in check_release_cache(None)] == [
+        'blog.W001'], (
+        'Убедитесь, что без POST_RELEASE_LOOP проверка напоминает '
+        'запустить release_posts.'
+    )
@@ -0,0 +1,134 @@
+import hashlib
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from blog.caching import fetch_tagged, get_cache, invalidate_tags
+from blog.page_cache import _page_key
+from conftest import N_PER_PAGE
+
+KEY = 'test:single-flight'
+
+
+class Compute:
+    def __init__(self, value='новое', tags=('tag',), delay=0):
+        self.calls = 0
+        self.value = value
+        self.tags = tags
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.value, self.tags
+
+
+def hold_lock():
+    get_cache().add(f'{KEY}:lock', 1)
+
+
+def test_concurrent_misses_compute_once():
+    compute = Compute(delay=0.2)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            fetch_tagged(KEY, compute)[0]))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert compute.calls == 1, (
+        'Убедитесь, что при одновременных промахах значение вычисляет'
+        ' только один процесс.'
+    )
+    assert results == ['новое'] * 5
+
+
+def test_stale_value_is_served_while_other_fills():
+    fetch_tagged(KEY, Compute('старое'))
+    invalidate_tags('tag')
+    hold_lock()
+    compute = Compute()
+    assert fetch_tagged(KEY, compute) == ('старое', 'stale')
+    assert compute.calls == 0
+
+
+@override_settings(BLOG_CACHE_STALE_SECONDS=0)
+def test_too_stale_value_waits_for_fill(monkeypatch):
+    monkeypatch.setattr('blog.caching.CACHE_LOCK_TIMEOUT', 0.1)
+    fetch_tagged(KEY, Compute('старое'))
+    invalidate_tags('tag')
+    time.sleep(0.01)
+    hold_lock()
+    assert fetch_tagged(KEY, Compute()) == ('новое', 'miss')
+
+
+def test_entries_are_refreshed_early(monkeypatch):
+    fetch_tagged(KEY, Compute('старое', delay=0.05), timeout=1)
+    monkeypatch.setattr('blog.caching.random.random', lambda: 1e-300)
+    assert fetch_tagged(KEY, Compute(), timeout=1) == ('новое', 'miss'), (
+        'Убедитесь, что записи с таймаутом обновляются заранее.'
+    )
+
+
+def test_unstorable_values_are_not_cached():
+    fetch_tagged(KEY, Compute(tags=None))
+    compute = Compute()
+    fetch_tagged(KEY, compute)
+    assert compute.calls == 1
+
+
+@pytest.mark.django_db
+def test_stale_page_is_served_while_other_fills(
+        mixer, unlogged_client, published_category):
+    post = mixer.blend(
+        'blog.Post', category=published_category, image=None)
+    url = f'/posts/{post.id}/'
+    unlogged_client.get(url)
+    mixer.blend('blog.Comment', post=post)
+    get_cache().add(f'{_page_key(RequestFactory().get(url))}:lock', 1)
+    assert unlogged_client.get(url)['X-Page-Cache'] == 'STALE', (
+        'Убедитесь, что пока страницу обновляет другой процесс,'
+        ' читателям отдаётся её устаревшая копия.'
+    )
+
+
+def test_values_built_from_stale_parts_are_not_stored():
+    def outer():
+        return fetch_tagged(KEY, Compute())[0] + '!', ('outer',)
+
+    fetch_tagged(KEY, Compute('старое'))
+    invalidate_tags('tag')
+    hold_lock()
+    assert fetch_tagged('test:outer', outer) == ('старое!', 'stale')
+    get_cache().delete(f'{KEY}:lock')
+    assert fetch_tagged('test:outer', outer) == ('новое!', 'miss'), (
+        'Убедитесь, что значение, собранное из устаревших частей,'
+        ' не сохраняется в кэше как свежее.'
+    )
+
+
+@pytest.mark.django_db
+def test_page_with_stale_feed_is_not_stored(
+        mixer, unlogged_client, published_category):
+    mixer.cycle(N_PER_PAGE).blend(
+        'blog.Post', category=published_category, image=None,
+        pub_date=timezone.now() - timedelta(days=1))
+    unlogged_client.get('/')
+    post = mixer.blend(
+        'blog.Post', category=published_category, image=None)
+    feed_key = hashlib.md5(
+        str(('index', 0, N_PER_PAGE)).encode()).hexdigest()
+    lock = f'blog:query:feed:{feed_key}:lock'
+    get_cache().add(lock, 1)
+    assert unlogged_client.get('/?utm=1')['X-Page-Cache'] == 'STALE'
+    get_cache().delete(lock)
+    response = unlogged_client.get('/?utm=1')
+    assert response['X-Page-Cache'] == 'MISS'
+    assert post.title in response.content.decode()
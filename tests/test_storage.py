@@ -0,0 +1,124 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from blog.constants import IMAGE_COLLECT_GRACE
+from blog.images import manifest_name, variant_name
+from blog.jobs import collect_orphaned_images
+from blog.media import IMMUTABLE, serve_media
+from blog.storage import is_content_addressed
+from conftest import image_file
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures('media_root')]
+
+
+def age(storage, name):
+    """Date the file back past the collection grace period."""
+    past = time.time() - 2 * IMAGE_COLLECT_GRACE
+    os.utime(storage.path(name), (past, past))
+
+
+def stored_files(root):
+    return sorted(
+        path.name for path in (root / 'posts').glob('*/*') if path.is_file())
+
+
+def test_identical_uploads_are_stored_once(mixer, user, media_root):
+    first, second = (
+        mixer.blend('blog.Post', author=user, image=image_file())
+        for _ in range(2)
+    )
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые картинки хранятся в одном файле.'
+    )
+    assert len(stored_files(media_root)) == 1
+    assert second.image_jobs.get().status == 'done'
+
+
+def test_orphaned_images_are_collected(
+        mixer, user, media_root, django_capture_on_commit_callbacks):
+    posts = mixer.cycle(2).blend('blog.Post', author=user, image=image_file())
+    storage, name = posts[0].image.storage, posts[0].image.name
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[0].delete()
+    assert storage.exists(name), (
+        'Убедитесь, что файл не удаляется, пока его использует'
+        ' другая публикация.'
+    )
+    age(storage, name)
+    with django_capture_on_commit_callbacks(execute=True):
+        posts[1].image = image_file(color=(0, 0, 0))
+        posts[1].save()
+    assert not storage.exists(name) and not storage.exists(
+        manifest_name(name)), (
+        'Убедитесь, что заменённая картинка и её варианты удаляются,'
+        ' когда на неё не ссылается ни одна публикация.'
+    )
+    assert len(stored_files(media_root)) == 1
+
+
+def test_hashed_media_is_cached_forever(mixer, user, media_root):
+    post = mixer.blend('blog.Post', author=user, image=image_file())
+    response = serve_media(
+        RequestFactory().get('/'), post.image.name,
+        document_root=str(media_root),
+    )
+    assert response['Cache-Control'] == IMMUTABLE
+
+
+def test_hashed_variants_are_cached_forever(mixer, user, media_root):
+    post = mixer.blend('blog.Post', author=user, image=image_file())
+    name = variant_name(post.image.name, 60, 'webp')
+    assert is_content_addressed(name), (
+        'Убедитесь, что варианты картинок тоже отдаются с '
+        'бессрочным кешированием.'
+    )
+    assert not is_content_addressed(manifest_name(post.image.name))
+
+
+def test_just_reused_image_is_not_collected(
+        mixer, user, media_root, django_capture_on_commit_callbacks):
+    post = mixer.blend('blog.Post', author=user, image=image_file())
+    storage, name = post.image.storage, post.image.name
+    age(storage, name)
+    # Another upload of the same bytes, its post not yet committed.
+    storage.save(name, image_file())
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert storage.exists(name), (
+        'Убедитесь, что только что загруженный файл не удаляется, '
+        'пока ссылающаяся на него публикация может быть не сохранена.'
+    )
+    age(storage, name)
+    call_command('process_images', stdout=StringIO())
+    assert not storage.exists(name)
+
+
+def test_field_file_save_names_file_by_content(mixer, user, media_root):
+    post = mixer.blend('blog.Post', author=user, image=None)
+    post.image.save('Photo.JPG', image_file())
+    first = post.image.name
+    assert is_content_addressed(first), (
+        'Убедитесь, что `post.image.save()` называет файл по его'
+        ' содержимому.'
+    )
+    post.image.save('photo.jpg', image_file(color=(0, 0, 0)))
+    assert post.image.name != first
+    assert post.image.name.endswith('.jpg')
+
+
+def test_sweep_reads_references_once(
+        mixer, user, media_root, django_assert_max_num_queries):
+    posts = [
+        mixer.blend('blog.Post', author=user, image=image_file(color=color))
+        for color in [(0, 0, 0), (255, 255, 255), (0, 0, 255)]
+    ]
+    storage = posts[0].image.storage
+    for post in posts:
+        age(storage, post.image.name)
+    with django_assert_max_num_queries(1):
+        assert collect_orphaned_images() == 0
@@ -0,0 +1,79 @@
+import pytest
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from conftest import image_file
+
+pytestmark = [pytest.mark.django_db, pytest.mark.usefixtures('media_root')]
+
+
+def create_post(client, category, image):
+    return client.post('/posts/create/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date': timezone.now().strftime('%Y-%m-%d %H:%M'),
+        'category': category.pk,
+        'image': image,
+    })
+
+
+def test_uploads_stream_to_temporary_files():
+    request = RequestFactory().post('/', {'image': image_file((10, 10))})
+    assert request.FILES['image'].temporary_file_path(), (
+        'Убедитесь, что загружаемые файлы пишутся во временный файл,'
+        ' а не в память.'
+    )
+
+
+def test_valid_image_is_accepted(user_client, user, published_category):
+    response = create_post(
+        user_client, published_category, image_file((50, 50)))
+    assert response.status_code == 302
+    assert user.posts.get().image
+
+
+@override_settings(IMAGE_UPLOAD_MAX_BYTES=1024)
+def test_oversized_file_is_rejected(user_client, user, published_category):
+    response = create_post(
+        user_client, published_category,
+        image_file((400, 400), image_format='BMP'))
+    assert response.status_code == 200
+    assert 'Файл больше' in str(response.context['form'].errors), (
+        'Убедитесь, что слишком большой файл картинки отклоняется.'
+    )
+    assert not user.posts.exists()
+
+
+@override_settings(IMAGE_UPLOAD_MAX_PIXELS=1_000_000)
+def test_decompression_bomb_is_rejected(
+        user_client, user, published_category):
+    image = image_file((2000, 2000))
+    assert image.size < 100_000
+    response = create_post(user_client, published_category, image)
+    assert response.status_code == 200
+    assert 'пикселей' in str(response.context['form'].errors), (
+        'Убедитесь, что картинка со слишком большим числом пикселей'
+        ' отклоняется до декодирования.'
+    )
+    assert not user.posts.exists()
+
+
+@override_settings(IMAGE_UPLOAD_MAX_BYTES=1024)
+def test_admin_rejects_oversized_file(
+        admin_client, admin_user, published_category):
+    now = timezone.now()
+    response = admin_client.post('/admin/blog/post/add/', {
+        'title': 'Заголовок',
+        'text': 'Текст',
+        'pub_date_0': now.strftime('%Y-%m-%d'),
+        'pub_date_1': now.strftime('%H:%M:%S'),
+        'author': admin_user.pk,
+        'category': published_category.pk,
+        'is_published': 'on',
+        'image': image_file((400, 400), image_format='BMP'),
+    })
+    assert response.status_code == 200
+    assert 'Файл больше' in response.content.decode(), (
+        'Убедитесь, что и админка отклоняет слишком большие картинки.'
+    )
+    assert not admin_user.posts.exists()
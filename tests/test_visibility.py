@@ -0,0 +1,84 @@
+import pytest
+
+from blog.caching import tag_versions
+from blog.querysets import get_published_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def category_posts(mixer, published_category):
+    return mixer.cycle(3).blend(
+        'blog.Post', category=published_category, is_published=True)
+
+
+def visible_ids():
+    return set(get_published_posts().values_list('id', flat=True))
+
+
+def test_category_toggle_updates_posts(published_category, category_posts):
+    ids = {post.id for post in category_posts}
+    assert visible_ids() == ids
+
+    published_category.is_published = False
+    published_category.save()
+    assert visible_ids() == set(), (
+        'Убедитесь, что при снятии категории с публикации её посты'
+        ' пропадают из лент.'
+    )
+
+    published_category.is_published = True
+    published_category.save()
+    assert visible_ids() == ids
+
+
+def test_category_toggle_invalidates_feeds_after_commit(
+        published_category, category_posts,
+        django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks() as callbacks:
+        published_category.is_published = False
+        published_category.save()
+    # A feed cached now would still hold the hidden posts once committed.
+    before = tag_versions('feed')
+    for callback in callbacks:
+        callback()
+    assert tag_versions('feed') != before, (
+        'Убедитесь, что кэш лент сбрасывается и после фиксации транзакции.'
+    )
+
+
+def test_hidden_post_stays_hidden_when_category_returns(
+        published_category, category_posts):
+    hidden = category_posts[0]
+    hidden.is_published = False
+    hidden.save()
+    published_category.is_published = False
+    published_category.save()
+    published_category.is_published = True
+    published_category.save()
+    assert hidden.id not in visible_ids()
+
+
+def test_category_delete_hides_posts(published_category, category_posts):
+    published_category.delete()
+    assert visible_ids() == set()
+
+
+def test_admin_list_editable_toggle(admin_client, published_category,
+                                    category_posts):
+    response = admin_client.post('/admin/blog/category/', {
+        'form-TOTAL_FORMS': 1,
+        'form-INITIAL_FORMS': 1,
+        'form-0-id': published_category.id,
+        'form-0-description': published_category.description,
+        'form-0-is_published': '',
+        '_save': 'Сохранить',
+    })
+    assert response.status_code == 302
+    assert visible_ids() == set()
+
+
+def test_feed_filter_does_not_join_categories():
+    sql = str(get_published_posts().query)
+    where = sql.split(' WHERE ', 1)[1]
+    assert 'blog_category' not in where